@@ -1,19 +1,157 @@
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
 import os
+import asyncio
+import re
 import hashlib
-from dotenv import load_dotenv
-from utils.model_adapter import get_llm_instance
-from agents.rag_agent import RAGAgent
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.model_adapter import get_llm_instance, get_text_extractor
+from utils import llm_cache, json_utils
+from utils.chunking import recursive_truncate, count_tokens, get_context_window
+from utils.rate_limiter import RateLimiter
 
 # Configure logging
 logger = logging.getLogger("AbstractAgent")
 
-# Load environment variables from .env file
-load_dotenv()
+# Bump when the abstract prompt template changes so cached responses are invalidated
+PROMPT_VERSION = "v2"
+
+# Default maximum number of LLM requests in flight for batch abstract generation
+MAX_BATCH_CONCURRENCY = 16
+
+# Token budget for the article content sent to the LLM; lowered further when the
+# model's context window can't fit it next to the prompt and the response
+MAX_CONTENT_TOKENS = 8000
+
+# Tokens reserved for the response when the model doesn't set max_tokens
+DEFAULT_COMPLETION_TOKENS = 1500
+
+# Maximum number of characters read from an article file. Well above a full paper,
+# so the truncation step still sees the conclusions, but bounds memory on huge files.
+MAX_ARTICLE_CHARS = 500000
+
+# Token budget for all article contents combined in a multi-article prompt; also
+# capped at half the model's context window to leave room for the answer
+MAX_MULTI_PROMPT_TOKENS = 12000
+
+# Outermost JSON object in an LLM response, e.g. inside a ```json fenced block
+_JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Polling interval bounds, in seconds, while waiting for an OpenAI batch
+BATCH_POLL_INITIAL_INTERVAL = 5.0
+BATCH_POLL_MAX_INTERVAL = 300.0
+
+# Longest wait for an OpenAI batch, in seconds, before it is cancelled. Batches may
+# take up to 24 hours, which is too long for a run someone is waiting on.
+BATCH_MAX_WAIT_SECONDS = 3600.0
+
+# Batch states after which the batch will not change anymore
+_BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+# "Title:" header line written at the top of article files
+_TITLE_RE = re.compile(r'^Title:(.*)$', re.MULTILINE)
+
+
+
+def _read_pdf_text(file_path: str) -> Tuple[str, str]:
+    """Extract the title and text of a PDF file"""
+    from pypdf import PdfReader
+    
+    reader = PdfReader(file_path)
+    pages, length = [], 0
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        pages.append(text)
+        length += len(text)
+        if length >= MAX_ARTICLE_CHARS:
+            break
+    content = "\n\n".join(pages)[:MAX_ARTICLE_CHARS]
+    
+    # Prefer the embedded title, otherwise the first line of text
+    title = (reader.metadata.title if reader.metadata else None) or ""
+    if not title.strip():
+        title = next((line for line in content.splitlines() if line.strip()), "")
+    return title.strip(), content
+
+
+def _pool_size(num_tasks: int, max_workers: int) -> int:
+    """
+    Number of threads for a pool running num_tasks LLM calls: the calls are
+    I/O-bound, so one per task up to max_workers requests in flight
+    """
+    return max(1, min(num_tasks, max_workers))
+
+
+def extract_article_text(file_path: str) -> Tuple[str, str]:
+    """
+    Read an article file and split it into its title and body.
+    
+    A module-level function so it can run in a process pool: PDF text
+    extraction is CPU-bound and holds the GIL most of the time.
+    
+    Args:
+        file_path: Path to a PDF or a text file with a "Title:" header
+        
+    Returns:
+        Tuple of (title, article content)
+    """
+    if file_path.lower().endswith('.pdf'):
+        title, content = _read_pdf_text(file_path)
+        logger.info(f"PDF text extracted successfully ({len(content)} characters)")
+        return title, content
+        
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read(MAX_ARTICLE_CHARS)
+        
+    logger.info(f"Article content read successfully ({len(content)} characters)")
+    logger.debug("Article content preview: %s...", content[:200])
+    
+    # Extract title from the file content
+    title_match = _TITLE_RE.search(content)
+    title = title_match.group(1).strip() if title_match else ""
+            
+    # Get the actual article content (skip the header with title and URL)
+    parts = content.split('\n', 3)
+    if len(parts) >= 3:
+        article_content = parts[3] if len(parts) == 4 else ""
+    else:
+        article_content = content
+    return title, article_content
+
 
 class AbstractAgent:
-    def __init__(self, provider: str = "openai", model_id: str = "gpt-3.5-turbo", api_key: Optional[str] = None):
+    # Prompt used for summarization; update PROMPT_VERSION when editing it
+    _PROMPT_TPL = (
+        "Article Title: {title}\n"
+        "\n"
+        "Article Content:\n"
+        "{content}\n"
+        "\n"
+        "Please provide a concise academic abstract of the above article content in no more than {max_words} words.\n"
+        "Focus on the main findings, methodology, and implications.\n"
+        "The abstract should be informative and self-contained, allowing readers to quickly understand\n"
+        "the key points of the article without reading the full text.\n"
+        "\n"
+        "Abstract:"
+    )
+    
+    # Prompt summarizing several articles in one request; update PROMPT_VERSION when editing it
+    _MULTI_PROMPT_TPL = (
+        "Below are {count} articles, each starting with its id.\n"
+        "\n"
+        "{articles}\n"
+        "For each article, provide a concise academic abstract in no more than {max_words} words.\n"
+        "Focus on the main findings, methodology, and implications.\n"
+        "Each abstract should be informative and self-contained.\n"
+        "\n"
+        "Return only a JSON object of the form\n"
+        '{{"abstracts": [{{"id": "<id>", "abstract": "<abstract>"}}, ...]}}'
+    )
+    
+    def __init__(self, provider: str = "openai", model_id: str = "gpt-3.5-turbo", api_key: Optional[str] = None,
+                 llm: Optional[Any] = None, rag_agent: Optional[Any] = None):
         """
         Initialize the abstract agent for summarizing article content
         
@@ -21,6 +159,8 @@ class AbstractAgent:
             provider: The model provider ('openai' or 'ollama')
             model_id: The model ID to use
             api_key: API key for OpenAI models (not needed for Ollama)
+            llm: Existing language model instance to share instead of creating one
+            rag_agent: Existing RAG agent to share; one is created on first use otherwise
         """
         logger.info(f"Initializing AbstractAgent with {provider} model: {model_id}")
         
@@ -28,45 +168,81 @@ class AbstractAgent:
         if provider == "openai" and not api_key:
             api_key = os.getenv("OPENAI_API_KEY")
             
+        self.provider = provider
+        self.model_id = model_id
+        self._api_key = api_key
+        
         # Initialize the language model for summarization
-        self.llm = get_llm_instance(
-            provider=provider,
-            model_id=model_id,
-            api_key=api_key
-        )
+        if llm is None:
+            llm = get_llm_instance(
+                provider=provider,
+                model_id=model_id,
+                api_key=api_key
+            )
+        self.llm = llm
+        self._extract = get_text_extractor(self.llm)
+        # Sampling temperature, part of the cache key since it changes the output
+        self.temperature = getattr(self.llm, "temperature", None)
         
-        # Initialize RAG agent for PDF processing
-        self.rag_agent = RAGAgent()
+        # RAG agent for PDF processing, created on first use unless one is shared
+        self._rag_agent = rag_agent
+        self._rag_agent_lock = threading.Lock()
         logger.info("AbstractAgent initialized successfully")
         
+    @property
+    def rag_agent(self):
+        """RAG agent used to extract content from PDFs, initialized lazily"""
+        if self._rag_agent is None:
+            with self._rag_agent_lock:
+                if self._rag_agent is None:
+                    from agents.rag_agent import RAGAgent
+                    self._rag_agent = RAGAgent()
+        return self._rag_agent
+        
+    def flush_knowledge_base(self) -> None:
+        """Write any PDF content still queued in the RAG agent to the vector store"""
+        if self._rag_agent is not None:
+            self._rag_agent.flush()
+            
+    def _invoke_text(self, prompt: str) -> str:
+        """Invoke the language model and return the response text"""
+        return self._extract(self.llm.invoke(prompt))
+        
+    async def _ainvoke_text(self, prompt: str) -> str:
+        """Invoke the language model asynchronously and return the response text"""
+        return self._extract(await self.llm.ainvoke(prompt))
+        
     def is_content_sufficient(self, content: str) -> bool:
         """Check if content is sufficient for abstract generation"""
-        # Simple heuristic: check if content has enough words and structure
-        words = content.split()
-        has_min_words = len(words) >= 100
-        has_paragraphs = content.count('\n\n') >= 2
-        return has_min_words and has_paragraphs
+        # Simple heuristic: check if content has at least 2 paragraph breaks and 100 words.
+        # Both checks stop scanning as soon as the threshold is reached.
+        first_break = content.find('\n\n')
+        if first_break == -1 or content.find('\n\n', first_break + 2) == -1:
+            return False
+        return len(content.split(None, 99)) >= 100
         
-    def generate_abstract(self, article_content: str, article_title: str = "", max_words: int = 200, pdf_url: Optional[str] = None) -> str:
-        """
-        Generate an abstract/summary for an article
+    def _completion_tokens(self) -> int:
+        """Maximum number of tokens in a response of the language model"""
+        return getattr(self.llm, "max_tokens", None) or DEFAULT_COMPLETION_TOKENS
         
-        Args:
-            article_content: The content of the article
-            article_title: The title of the article
-            max_words: Maximum length of the summary in words
-            pdf_url: Optional URL to PDF version of the article
-            
-        Returns:
-            A concise summary of the article
-        """
-        logger.info("Generating abstract...")
+    def _content_token_budget(self, article_title: str, max_words: int) -> int:
+        """Tokens left for the article content once the prompt and the response fit in the context window"""
+        template_tokens = count_tokens(self._PROMPT_TPL.format_map({
+            "title": article_title,
+            "content": "",
+            "max_words": max_words
+        }), self.model_id)
+        available = get_context_window(self.model_id) - self._completion_tokens() - template_tokens
+        return max(1, min(MAX_CONTENT_TOKENS, available))
         
+    def _prepare_content(self, article_content: str, pdf_url: Optional[str], article_title: str = "",
+                         max_words: int = 200) -> str:
+        """Fall back to the PDF for thin content and truncate to the token budget"""
         # Check if content is sufficient
         if not self.is_content_sufficient(article_content) and pdf_url:
             logger.info("Content insufficient, attempting to process PDF...")
             # Generate a unique ID for the article
-            article_id = hashlib.md5(pdf_url.encode()).hexdigest()
+            article_id = hashlib.blake2b(pdf_url.encode(), digest_size=16).hexdigest()
             
             # Extract content from PDF
             pdf_result = self.rag_agent.extract_article_content(pdf_url, article_id)
@@ -76,36 +252,110 @@ class AbstractAgent:
             else:
                 logger.warning(f"Failed to process PDF: {pdf_result.get('error')}")
         
-        # Truncate content if it's too long to fit in the context window
-        max_content_length = 100000  # Approximate token limit
-        if len(article_content) > max_content_length:
-            article_content = article_content[:max_content_length] + "..."
+        # Truncate content if it's too long to fit in the context window,
+        # keeping the introduction, the conclusions and the densest middle sections
+        return recursive_truncate(article_content, max_tokens=self._content_token_budget(article_title, max_words),
+                                  model_id=self.model_id)
+        
+    def _cache_key(self, article_title: str, article_content: str, max_words: int) -> str:
+        """
+        Cache key of an abstract. The template itself is covered by PROMPT_VERSION,
+        so only the variable fields are hashed.
+        """
+        return llm_cache.make_key(PROMPT_VERSION, self.provider, self.model_id, self.temperature,
+                                  article_title, article_content, max_words)
+        
+    def _prepare_abstract(self, article_content: str, article_title: str, max_words: int,
+                          pdf_url: Optional[str]) -> Tuple[str, Optional[str], str]:
+        """
+        Do the work that precedes the LLM call: PDF fallback, truncation and cache lookup
+        
+        Returns:
+            Tuple of (cache key, cached abstract or None, prompt)
+        """
+        article_content = self._prepare_content(article_content, pdf_url, article_title, max_words)
             
+        # Reuse a previous response for identical inputs
+        cache_key = self._cache_key(article_title, article_content, max_words)
+        cached_abstract = llm_cache.get(cache_key)
+        if cached_abstract is not None:
+            return cache_key, cached_abstract, ""
+        
         # Create prompt for summarization
-        prompt = f"""
-        Article Title: {article_title}
+        prompt = self._PROMPT_TPL.format_map({
+            "title": article_title,
+            "content": article_content,
+            "max_words": max_words
+        })
+        return cache_key, None, prompt
         
-        Article Content:
-        {article_content}
+    def _store_abstract(self, cache_key: str, abstract: str) -> str:
+        """Clean up a generated abstract and cache it"""
+        logger.info(f"Abstract generated ({len(abstract)} characters)")
+        logger.debug("Generated abstract: %s", abstract)
+        abstract = abstract.strip()
+        llm_cache.put(cache_key, abstract, prompt_version=PROMPT_VERSION, model_id=self.model_id)
+        return abstract
         
-        Please provide a concise academic abstract of the above article content in no more than {max_words} words.
-        Focus on the main findings, methodology, and implications.
-        The abstract should be informative and self-contained, allowing readers to quickly understand 
-        the key points of the article without reading the full text.
+    def generate_abstract(self, article_content: str, article_title: str = "", max_words: int = 200, pdf_url: Optional[str] = None) -> str:
+        """
+        Generate an abstract/summary for an article
         
-        Abstract:
+        Args:
+            article_content: The content of the article
+            article_title: The title of the article
+            max_words: Maximum length of the summary in words
+            pdf_url: Optional URL to PDF version of the article
+            
+        Returns:
+            A concise summary of the article
         """
+        logger.info("Generating abstract...")
+        cache_key, cached_abstract, prompt = self._prepare_abstract(article_content, article_title, max_words, pdf_url)
+        if cached_abstract is not None:
+            logger.info("Using cached abstract")
+            return cached_abstract
         
         try:
             logger.info("Sending prompt to LLM...")
             # Generate summary using the language model
-            response = self.llm.invoke(prompt)
+            return self._store_abstract(cache_key, self._invoke_text(prompt))
+            
+        except Exception as e:
+            logger.error(f"Error generating abstract: {e}")
+            return f"Error generating abstract: {e}"
             
-            # Extract and return the abstract
-            abstract = response.content if hasattr(response, 'content') else response
-            logger.info(f"Abstract generated ({len(abstract)} characters)")
-            logger.debug(f"Generated abstract: {abstract}")
-            return abstract.strip()
+    async def agenerate_abstract(self, article_content: str, article_title: str = "", max_words: int = 200, pdf_url: Optional[str] = None,
+                                 rate_limiter: Optional[RateLimiter] = None) -> str:
+        """
+        Generate an abstract/summary for an article without blocking the event loop
+        
+        Args:
+            article_content: The content of the article
+            article_title: The title of the article
+            max_words: Maximum length of the summary in words
+            pdf_url: Optional URL to PDF version of the article
+            rate_limiter: Optional limiter to wait on before calling the LLM
+            
+        Returns:
+            A concise summary of the article
+        """
+        logger.info("Generating abstract...")
+        # PDF download, tokenization and cache lookup block, so they run in a worker thread
+        cache_key, cached_abstract, prompt = await asyncio.to_thread(
+            self._prepare_abstract, article_content, article_title, max_words, pdf_url
+        )
+        if cached_abstract is not None:
+            logger.info("Using cached abstract")
+            return cached_abstract
+        
+        try:
+            if rate_limiter is not None:
+                # Prompt plus a rough upper bound of the completion (~2 tokens per word)
+                await rate_limiter.acquire(count_tokens(prompt, self.model_id) + 2 * max_words)
+            logger.info("Sending prompt to LLM...")
+            abstract = await self._ainvoke_text(prompt)
+            return await asyncio.to_thread(self._store_abstract, cache_key, abstract)
             
         except Exception as e:
             logger.error(f"Error generating abstract: {e}")
@@ -123,36 +373,8 @@ class AbstractAgent:
             Dictionary with the article path and its abstract
         """
         logger.info(f"Processing article file: {file_path}")
-        
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                
-            logger.info(f"Article content read successfully ({len(content)} characters)")
-            logger.debug(f"Article content preview: {content[:200]}...")
-            
-            # Extract title from the file content
-            title = ""
-            lines = content.split('\n')
-            for line in lines:
-                if line.startswith("Title:"):
-                    title = line.replace("Title:", "").strip()
-                    break
-                    
-            # Get the actual article content (skip the header with title and URL)
-            article_content = "\n".join(lines[3:]) if len(lines) >= 3 else content
-            
-            # Generate abstract
-            logger.info(f"Generating abstract for: {title}")
-            abstract = self.generate_abstract(article_content, title, pdf_url=pdf_url)
-            
-            return {
-                "file_path": file_path,
-                "title": title,
-                "abstract": abstract,
-                "pdf_processed": pdf_url is not None
-            }
-            
+            title, article_content = extract_article_text(file_path)
         except Exception as e:
             logger.error(f"Error processing article file {file_path}: {e}")
             return {
@@ -160,4 +382,344 @@ class AbstractAgent:
                 "title": "",
                 "abstract": f"Error processing article: {e}",
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+            
+        logger.info(f"Generating abstract for: {title}")
+        return {
+            "file_path": file_path,
+            "title": title,
+            "abstract": self.generate_abstract(article_content, title, pdf_url=pdf_url),
+            "pdf_processed": pdf_url is not None
+        }
+            
+    async def aprocess_article_text(self, file_path: str, title: str, article_content: str,
+                                    pdf_url: Optional[str] = None,
+                                    rate_limiter: Optional[RateLimiter] = None) -> Dict[str, Any]:
+        """
+        Generate an abstract for article text already extracted with extract_article_text
+        
+        Args:
+            file_path: Path of the article file the text comes from
+            title: The title of the article
+            article_content: The content of the article
+            pdf_url: Optional URL to PDF version of the article
+            rate_limiter: Optional limiter to wait on before calling the LLM
+            
+        Returns:
+            Dictionary with the article path and its abstract
+        """
+        logger.info(f"Generating abstract for: {title}")
+        return {
+            "file_path": file_path,
+            "title": title,
+            "abstract": await self.agenerate_abstract(article_content, title, pdf_url=pdf_url,
+                                                      rate_limiter=rate_limiter),
+            "pdf_processed": pdf_url is not None
+        }
+            
+    def _group_for_multi_prompt(self, items: List[Dict[str, Any]], batch_size: int) -> List[List[Dict[str, Any]]]:
+        """
+        Group prepared articles into prompts of at most batch_size articles within the token
+        budget. An article that alone exceeds the budget ends up in a group of its own, which
+        is summarized with a single-article call.
+        """
+        budget = min(MAX_MULTI_PROMPT_TOKENS, get_context_window(self.model_id) // 2)
+        groups, group, group_tokens = [], [], 0
+        for item in items:
+            tokens = count_tokens(item["article_content"], self.model_id)
+            if group and (len(group) >= batch_size or group_tokens + tokens > budget):
+                groups.append(group)
+                group, group_tokens = [], 0
+            group.append(item)
+            group_tokens += tokens
+        if group:
+            groups.append(group)
+        return groups
+        
+    def _generate_abstract_group(self, group: List[Dict[str, Any]], max_words: int) -> None:
+        """
+        Generate abstracts for a group of prepared articles with a single LLM call,
+        storing each in item["abstract"]. Falls back to one call per article when
+        the answer can't be parsed or misses articles.
+        """
+        if len(group) > 1:
+            articles = "\n".join(
+                f"[id: {i}]\nArticle Title: {item['title']}\nArticle Content:\n{item['article_content']}\n"
+                for i, item in enumerate(group)
+            )
+            prompt = self._MULTI_PROMPT_TPL.format_map({
+                "count": len(group),
+                "articles": articles,
+                "max_words": max_words
+            })
+            try:
+                content = self._invoke_text(prompt)
+                match = _JSON_BLOCK_RE.search(content)
+                answer = json_utils.loads(match.group(0) if match else content)
+                for entry in answer["abstracts"]:
+                    i = int(entry["id"])
+                    if 0 <= i < len(group) and entry.get("abstract"):
+                        group[i]["abstract"] = self._store_abstract(group[i]["cache_key"], str(entry["abstract"]))
+            except Exception as e:
+                logger.warning(f"Could not use multi-article answer ({e}), generating individually")
+                
+        for item in group:
+            if "abstract" not in item:
+                item["abstract"] = self.generate_abstract(item["article_content"], item["title"], max_words=max_words)
+                
+    def process_article_files_batch(self, filepaths: List[str], batch_size: int = 5, max_words: int = 200,
+                                    pdf_urls: Optional[Dict[str, Optional[str]]] = None,
+                                    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                                    max_workers: int = MAX_BATCH_CONCURRENCY) -> List[Dict[str, Any]]:
+        """
+        Generate abstracts for article files, summarizing up to batch_size articles per
+        LLM call so the instructions are sent once per group instead of once per article
+        
+        Args:
+            filepaths: Paths to the article files
+            batch_size: Maximum number of articles per prompt
+            max_words: Maximum length of each summary in words
+            pdf_urls: Optional mapping of file path to the article's PDF URL
+            on_result: Optional callback given each article's result as soon as it is known
+            max_workers: Maximum number of multi-article prompts in flight
+            
+        Returns:
+            Dictionaries with the article path and its abstract, in input order
+        """
+        pdf_urls = pdf_urls or {}
+        results: List[Dict[str, Any]] = []
+        pending = []
+        for file_path in filepaths:
+            pdf_url = pdf_urls.get(file_path)
+            try:
+                title, article_content = extract_article_text(file_path)
+                article_content = self._prepare_content(article_content, pdf_url, title, max_words)
+            except Exception as e:
+                logger.error(f"Error processing article file {file_path}: {e}")
+                result = {
+                    "file_path": file_path,
+                    "title": "",
+                    "abstract": f"Error processing article: {e}",
+                    "error": str(e)
+                }
+                results.append(result)
+                if on_result is not None:
+                    on_result(result)
+                continue
+                
+            result = {"file_path": file_path, "title": title, "pdf_processed": pdf_url is not None}
+            results.append(result)
+            cache_key = self._cache_key(title, article_content, max_words)
+            cached_abstract = llm_cache.get(cache_key)
+            if cached_abstract is not None:
+                result["abstract"] = cached_abstract
+                if on_result is not None:
+                    on_result(result)
+            else:
+                pending.append({
+                    "result": result,
+                    "title": title,
+                    "article_content": article_content,
+                    "cache_key": cache_key
+                })
+                
+        groups = self._group_for_multi_prompt(pending, batch_size)
+        if groups:
+            workers = _pool_size(len(groups), max_workers)
+            logger.info(f"Generating {len(pending)} abstracts in {len(groups)} multi-article prompts, {workers} at a time")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self._generate_abstract_group, group, max_words): group for group in groups}
+                for future in as_completed(futures):
+                    future.result()
+                    for item in futures[future]:
+                        item["result"]["abstract"] = item["abstract"]
+                        if on_result is not None:
+                            on_result(item["result"])
+                
+        return results
+        
+    def submit_abstract_batch(self, filepaths: List[str], max_words: int = 200,
+                              pdf_urls: Optional[Dict[str, Optional[str]]] = None) -> Dict[str, Any]:
+        """
+        Submit abstract generation for several article files to the OpenAI Batch API.
+        Batches are billed at half price but may take up to 24 hours to complete.
+        
+        Args:
+            filepaths: Paths to the article files
+            max_words: Maximum length of each summary in words
+            pdf_urls: Optional mapping of file path to the article's PDF URL
+            
+        Returns:
+            Submission dictionary for collect_abstract_batch, with the batch ID (None if
+            every abstract was cached), results already known and the pending requests
+        """
+        pdf_urls = pdf_urls or {}
+        submission = {"batch_id": None, "filepaths": list(filepaths), "results": {}, "pending": {}}
+        lines = []
+        for i, file_path in enumerate(filepaths):
+            try:
+                title, article_content = extract_article_text(file_path)
+                cache_key, cached_abstract, prompt = self._prepare_abstract(article_content, title, max_words,
+                                                                            pdf_urls.get(file_path))
+            except Exception as e:
+                logger.error(f"Error processing article file {file_path}: {e}")
+                submission["results"][file_path] = {
+                    "file_path": file_path,
+                    "title": "",
+                    "abstract": f"Error processing article: {e}",
+                    "error": str(e)
+                }
+                continue
+                
+            if cached_abstract is not None:
+                submission["results"][file_path] = {
+                    "file_path": file_path,
+                    "title": title,
+                    "abstract": cached_abstract,
+                    "pdf_processed": pdf_urls.get(file_path) is not None
+                }
+                continue
+                
+            # Custom IDs are short and unique; file paths can be long
+            custom_id = f"article-{i}"
+            submission["pending"][custom_id] = {
+                "file_path": file_path,
+                "title": title,
+                "pdf_processed": pdf_urls.get(file_path) is not None,
+                "cache_key": cache_key,
+                "article_content": article_content
+            }
+            lines.append(json_utils.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model_id,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": self.temperature if self.temperature is not None else 0.7,
+                    "max_tokens": self._completion_tokens()
+                }
+            }))
+            
+        if not lines:
+            logger.info("All abstracts were cached, no batch submitted")
+            return submission
+            
+        client = self._openai_client()
+        batch_file = client.files.create(file=("abstracts.jsonl", "\n".join(lines).encode()), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        submission["batch_id"] = batch.id
+        logger.info(f"Submitted OpenAI batch {batch.id} with {len(lines)} abstract requests")
+        return submission
+        
+    def collect_abstract_batch(self, submission: Dict[str, Any], max_words: int = 200,
+                               on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                               max_wait: float = BATCH_MAX_WAIT_SECONDS) -> List[Dict[str, Any]]:
+        """
+        Wait for a batch from submit_abstract_batch to finish and collect its abstracts.
+        Requests the batch did not answer are generated with individual calls.
+        
+        Args:
+            submission: The dictionary returned by submit_abstract_batch
+            max_words: Maximum length of each summary in words
+            on_result: Optional callback given each article's result as soon as it is known
+            max_wait: Seconds to wait for the batch before cancelling it
+            
+        Returns:
+            Dictionaries with the article path and its abstract, in submission order
+            
+        Raises:
+            TimeoutError: If the batch didn't finish within max_wait; it is cancelled,
+                and the abstracts not yet reported through on_result are left to the caller
+        """
+        results = {}
+        pending = dict(submission["pending"])
+        
+        def add_result(result: Dict[str, Any]) -> None:
+            results[result["file_path"]] = result
+            if on_result is not None:
+                on_result(result)
+                
+        for result in submission["results"].values():
+            add_result(result)
+        
+        if submission["batch_id"]:
+            client = self._openai_client()
+            interval = BATCH_POLL_INITIAL_INTERVAL
+            deadline = time.monotonic() + max_wait
+            batch = client.batches.retrieve(submission["batch_id"])
+            while batch.status not in _BATCH_FINAL_STATES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    try:
+                        client.batches.cancel(batch.id)
+                    except Exception as e:
+                        logger.warning(f"Could not cancel OpenAI batch {batch.id}: {e}")
+                    raise TimeoutError(f"OpenAI batch {batch.id} still {batch.status} after {max_wait:.0f}s, cancelled")
+                logger.info(f"OpenAI batch {batch.id} is {batch.status}, checking again in {interval:.0f}s")
+                time.sleep(min(interval, remaining))
+                interval = min(interval * 2, BATCH_POLL_MAX_INTERVAL)
+                batch = client.batches.retrieve(batch.id)
+            logger.info(f"OpenAI batch {batch.id} finished with status: {batch.status}")
+            
+            if batch.output_file_id:
+                output = client.files.content(batch.output_file_id).text
+                for line in output.splitlines():
+                    if not line.strip():
+                        continue
+                    record = json_utils.loads(line)
+                    request = pending.get(record.get("custom_id"))
+                    response = record.get("response") or {}
+                    if request is None or response.get("status_code") != 200:
+                        continue
+                    abstract = response["body"]["choices"][0]["message"]["content"]
+                    add_result({
+                        "file_path": request["file_path"],
+                        "title": request["title"],
+                        "abstract": self._store_abstract(request["cache_key"], abstract),
+                        "pdf_processed": request.get("pdf_processed", False)
+                    })
+                    del pending[record["custom_id"]]
+                    
+        # Anything the batch failed to answer falls back to a regular call
+        if pending:
+            logger.warning(f"{len(pending)} abstracts missing from batch output, generating individually")
+            for request in pending.values():
+                add_result({
+                    "file_path": request["file_path"],
+                    "title": request["title"],
+                    "abstract": self.generate_abstract(request["article_content"], request["title"], max_words=max_words),
+                    "pdf_processed": request.get("pdf_processed", False)
+                })
+                
+        return [results[file_path] for file_path in submission["filepaths"]]
+        
+    def process_article_files_batch_api(self, filepaths: List[str], max_words: int = 200,
+                                        pdf_urls: Optional[Dict[str, Optional[str]]] = None,
+                                        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+                                        ) -> List[Dict[str, Any]]:
+        """
+        Generate abstracts for article files through the OpenAI Batch API
+        
+        Args:
+            filepaths: Paths to the article files
+            max_words: Maximum length of each summary in words
+            pdf_urls: Optional mapping of file path to the article's PDF URL
+            on_result: Optional callback given each article's result as soon as it is known
+            
+        Returns:
+            Dictionaries with the article path and its abstract, in input order
+        """
+        submission = self.submit_abstract_batch(filepaths, max_words=max_words, pdf_urls=pdf_urls)
+        return self.collect_abstract_batch(submission, max_words=max_words, on_result=on_result)
+        
+    def _openai_client(self):
+        """OpenAI client for Batch API requests"""
+        if self.provider != "openai":
+            raise ValueError("The Batch API is only available for OpenAI models")
+        from openai import OpenAI
+        return OpenAI(api_key=self._api_key)
@@ -1,31 +1,58 @@
 import os
-import requests
+import string
+import asyncio
+import aiofiles
+import aiohttp
 from typing import List, Dict, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of open connections shared by concurrent PDF downloads
+MAX_DOWNLOAD_CONNECTIONS = 16
+
+# Maximum number of concurrent downloads from a single host; nearly all PDFs come
+# from arxiv.org, which throttles clients that open many parallel connections
+MAX_CONNECTIONS_PER_HOST = 4
+
+# Copy buffer size used when streaming PDFs to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# (connect, read) timeouts in seconds; the read timeout applies between chunks
+DOWNLOAD_TIMEOUT = (5, 30)
+
+# Translation table deleting every ASCII character that isn't allowed in a filename
+_FILENAME_CHARS = set(string.ascii_letters + string.digits + '_')
+_SANITIZE_TABLE = str.maketrans('', '', ''.join(chr(i) for i in range(128) if chr(i) not in _FILENAME_CHARS))
+
+def _sanitize_filename(text: str) -> str:
+    """Keep only alphanumeric characters and underscores"""
+    sanitized = text.translate(_SANITIZE_TABLE)
+    if not sanitized.isascii():
+        # Rare non-ASCII titles: keep unicode letters/digits, drop the rest
+        sanitized = ''.join(c for c in sanitized if c.isalnum() or c == '_')
+    return sanitized
+
 class IntegrationAgent:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
 
-    def download_pdf(self, pdf_url: str, title: str) -> str:
-        """Download PDF from arXiv and save with the article's title"""
-        try:
-            # Create sanitized filename
-            sanitized_title = ''.join(c if c.isalnum() or c == '_' else '' for c in title)
-            filename = f"{sanitized_title[:100]}.pdf"
-            filepath = os.path.join(self.data_dir, filename)
+    def _pdf_filepath(self, title: str) -> str:
+        """Build the local path of a PDF from the article's title"""
+        filename = f"{_sanitize_filename(title)[:100]}.pdf"
+        return os.path.join(self.data_dir, filename)
 
-            # Download PDF
-            response = requests.get(pdf_url, stream=True)
-            response.raise_for_status()
+    async def _download_pdf_async(self, session: aiohttp.ClientSession, pdf_url: str, title: str) -> str:
+        """Download PDF from arXiv on the event loop and save with the article's title"""
+        try:
+            filepath = self._pdf_filepath(title)
+            filename = os.path.basename(filepath)
 
-            # Save PDF
-            with open(filepath, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            async with session.get(pdf_url) as response:
+                response.raise_for_status()
+                async with aiofiles.open(filepath, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        await f.write(chunk)
 
             logger.info(f"Successfully downloaded PDF: {filename}")
             return filepath
@@ -34,62 +61,42 @@ class IntegrationAgent:
             logger.error(f"Error downloading PDF from {pdf_url}: {e}")
             return ""
 
-    def process_articles(self, articles: List[Dict[str, Any]], topic: str) -> tuple:
-        """Process articles: download PDFs and create CSV
+    async def _process_async(self, articles: List[Dict[str, Any]]) -> tuple:
+        """Download all PDFs concurrently and record their local paths"""
+        # Work on copies so the articles in the workflow state are left untouched
+        articles = [dict(article) for article in articles]
+        pdf_articles = [article for article in articles if article.get('pdf_url')]
+        if pdf_articles:
+            connector = aiohttp.TCPConnector(limit=MAX_DOWNLOAD_CONNECTIONS, limit_per_host=MAX_CONNECTIONS_PER_HOST)
+            timeout = aiohttp.ClientTimeout(sock_connect=DOWNLOAD_TIMEOUT[0], sock_read=DOWNLOAD_TIMEOUT[1])
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                # Articles with the same title share a file, so download it only once
+                # instead of having concurrent downloads write to the same path
+                downloads = {}
+                for article in pdf_articles:
+                    downloads.setdefault(self._pdf_filepath(article['title']), article)
+                pdf_paths = await asyncio.gather(*[
+                    self._download_pdf_async(session, article['pdf_url'], article['title'])
+                    for article in downloads.values()
+                ])
+            downloaded = dict(zip(downloads.keys(), pdf_paths))
+            for article in pdf_articles:
+                article['local_pdf_path'] = downloaded[self._pdf_filepath(article['title'])]
+                
+        # Keep track of which URL maps to which file path
+        url_to_filepath = {
+            article['url']: article['local_pdf_path']
+            for article in articles if article.get('url') and article.get('local_pdf_path')
+        }
+        logger.info(f"Downloaded {len(url_to_filepath)} PDFs for {len(articles)} articles")
+        return articles, url_to_filepath
+
+    def process_articles(self, articles: List[Dict[str, Any]]) -> tuple:
+        """Process articles: download PDFs. Nothing is written to CSV here; the
+        transformation step writes the final CSV once all details are known.
         
         Returns:
-            tuple: (csv_path, url_to_filepath) - CSV file path and mapping of URLs to local file paths
+            tuple: (articles, url_to_filepath) - Copies of the articles with their local_pdf_path
+                and mapping of URLs to local file paths
         """
-        # Download PDFs for each article
-        for article in articles:
-            if article.get('pdf_url'):
-                pdf_path = self.download_pdf(article['pdf_url'], article['title'])
-                article['local_pdf_path'] = pdf_path
-
-        # Save to CSV and get URL to filepath mapping
-        csv_path, url_to_filepath = self.save_articles_to_csv(articles, topic)
-        return csv_path, url_to_filepath
-
-    def save_articles_to_csv(self, articles: List[Dict[str, Any]], topic: str) -> str:
-        """Save the collected articles to a CSV file"""
-        try:
-            import pandas as pd
-            import os
-            
-            # Create a sanitized filename for the CSV
-            sanitized_topic = ''.join(c if c.isalnum() or c == '_' else '_' for c in topic)
-            csv_filename = f"{sanitized_topic}_research_articles.csv"
-            csv_path = os.path.join(self.data_dir, csv_filename)
-            
-            # Extract data for CSV
-            data = []
-            url_to_filepath = {}
-            
-            for article in articles:
-                row = {}
-                for key in ['title', 'url', 'source', 'query', 'snippet', 'pdf_url']:
-                    row[key] = article.get(key, '')
-                
-                # Track local PDF path
-                local_pdf_path = article.get('local_pdf_path', '')
-                row['local_pdf_path'] = local_pdf_path
-                
-                # Keep track of which URL maps to which file path
-                if local_pdf_path and article.get('url'):
-                    url_to_filepath[article['url']] = local_pdf_path
-                
-                data.append(row)
-            
-            # Create DataFrame and save to CSV
-            if data:
-                df = pd.DataFrame(data)
-                df.to_csv(csv_path, index=False)
-                logger.info(f"Saved {len(data)} articles to CSV: {csv_path}")
-                return csv_path, url_to_filepath
-            else:
-                logger.warning("No articles to save to CSV")
-                return None, {}
-                
-        except Exception as e:
-            logger.error(f"Error saving articles to CSV: {e}")
-            return None, {}
+        return asyncio.run(self._process_async(articles))
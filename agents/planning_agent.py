@@ -1,16 +1,29 @@
 import logging
 from typing import Dict, List, Any, Optional
 import os
-from dotenv import load_dotenv
-from utils.model_adapter import get_llm_instance
+import re
+from utils import json_utils
+from utils.model_adapter import get_llm_instance, get_text_extractor
+from utils import llm_cache
+from utils.semantic_cache import SemanticCache
 
 logger = logging.getLogger("PlanningAgent")
 
-# Load environment variables from .env file
-load_dotenv()
+# Bump when the planning prompt template changes so cached responses are invalidated
+PROMPT_VERSION = "v1"
+
+# Outermost JSON object in an LLM response, e.g. inside a ```json fenced block
+_JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+
+def _parse_json_response(content: str) -> Any:
+    """Parse the JSON object embedded in an LLM response"""
+    match = _JSON_BLOCK_RE.search(content)
+    return json_utils.loads(match.group(0) if match else content)
 
 class PlanningAgent:
-    def __init__(self, provider: str = "openai", model_id: str = "gpt-3.5-turbo", api_key: Optional[str] = None):
+    def __init__(self, provider: str = "openai", model_id: str = "gpt-3.5-turbo", api_key: Optional[str] = None,
+                 llm: Optional[Any] = None, semantic_cache: Optional[SemanticCache] = None):
         """
         Initialize the planning agent with the specified model.
         
@@ -18,6 +31,8 @@ class PlanningAgent:
             provider: The model provider ('openai' or 'ollama')
             model_id: The model ID to use
             api_key: API key for OpenAI models (not needed for Ollama)
+            llm: Existing language model instance to share instead of creating one
+            semantic_cache: Optional cache reusing the plan of a near-identical topic
         """
         logger.info(f"Initializing PlanningAgent with {provider} model: {model_id}")
         
@@ -25,8 +40,19 @@ class PlanningAgent:
         if provider == "openai" and not api_key:
             api_key = os.getenv("OPENAI_API_KEY")
             
+        self.provider = provider
+        self.model_id = model_id
+        
         # Initialize the language model for planning
-        self.llm = get_llm_instance(provider, model_id, api_key)
+        self.llm = llm if llm is not None else get_llm_instance(provider, model_id, api_key)
+        self._extract = get_text_extractor(self.llm)
+        # Sampling temperature, part of the cache key since it changes the output
+        self.temperature = getattr(self.llm, "temperature", None)
+        self.semantic_cache = semantic_cache
+        
+    def _invoke_text(self, prompt: str) -> str:
+        """Invoke the language model and return the response text"""
+        return self._extract(self.llm.invoke(prompt))
         
     def generate_plan(self, topic_keywords: str) -> Dict[str, Any]:
         
@@ -69,25 +95,32 @@ class PlanningAgent:
             }}
         }}
         """
-        logger.info("Sending prompt to LLM...")
+        cache_key = llm_cache.make_key(PROMPT_VERSION, self.provider, self.model_id, self.temperature, prompt)
+        # Semantic cache entries are shared by all topics with the same prompt template and model
+        namespace = llm_cache.make_key(PROMPT_VERSION, self.provider, self.model_id, self.temperature)
         
         try:
-            response = self.llm.invoke(prompt)
-            logger.info("Received response from LLM")
-            logger.debug(f"Raw LLM response: {response}")
+            # Responses are only cached once they parse, so a bad answer is never replayed
+            from_llm = False
+            content = llm_cache.get(cache_key)
+            if content is not None:
+                logger.info("Using cached LLM response")
+            elif self.semantic_cache is not None and (content := self.semantic_cache.get(namespace, topic_keywords)) is not None:
+                # Not copied into the exact cache: a false match must not become this topic's exact answer
+                logger.info("Using LLM response cached for a similar topic")
+            else:
+                logger.info("Sending prompt to LLM...")
+                content = self._invoke_text(prompt)
+                from_llm = True
+                logger.info("Received response from LLM")
+                logger.debug("Raw LLM response: %s", content)
             
             # Process the response
             try:
-                # Extract content from response (format depends on LLM output)
-                content = response.content if hasattr(response, 'content') else response
-                # For simplicity in this example, we're returning a dict directly
-                # In a real implementation, you would parse the JSON response
-                
-                # This is a placeholder - you would need to parse the actual JSON
-                import json
+                # The LLM often wraps the JSON in prose or markdown fences
                 try:
-                    plan = json.loads(content)
-                except json.JSONDecodeError:
+                    plan = _parse_json_response(content)
+                except json_utils.JSONDecodeError:
                     # Fallback if JSON parsing fails
                     plan = {
                         "subtopics": ["General " + topic_keywords],
@@ -95,9 +128,14 @@ class PlanningAgent:
                         "expected_outcome": f"General overview of {topic_keywords}",
                         "research_strategy": "General search on the topic"
                     }
+                else:
+                    if from_llm:
+                        llm_cache.put(cache_key, content, prompt_version=PROMPT_VERSION, model_id=self.model_id)
+                        if self.semantic_cache is not None:
+                            self.semantic_cache.put(namespace, topic_keywords, content)
                 
                 logger.info("Plan generated successfully")
-                logger.info(f"Plan details: {plan}")
+                logger.info("Plan details: %s", plan)
                 return {
                     "topic": topic_keywords,
                     "plan": plan
@@ -128,9 +166,9 @@ class PlanningAgent:
         """
         
         try:
-            terms = self.llm.invoke(prompt)
+            terms = self._invoke_text(prompt)
             search_terms = [term.strip() for term in terms.split('\n') if term.strip()]
-            logger.info(f"Extracted search terms: {search_terms}")
+            logger.info("Extracted search terms: %s", search_terms)
             return search_terms
         except Exception as e:
             logger.error(f"Error extracting search terms: {e}")
@@ -1,37 +1,86 @@
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import os
+import re
+import numpy as np
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OllamaEmbeddings
 from langchain.retrievers import ParentDocumentRetriever
 from langchain.storage import InMemoryStore
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_transformers import LongContextReorder
+from langchain_core.documents import Document
 import chromadb
-import requests
 import tempfile
-from dotenv import load_dotenv
+import threading
+from contextlib import contextmanager
+from utils.embeddings import CachedEmbeddings, ConcurrentOllamaEmbeddings
+from utils.http_utils import create_session
 
 # Configure logging
 logger = logging.getLogger("RAGAgent")
 
-# Load environment variables
-load_dotenv()
+# Single query used to pull the first-page content (title, authors, abstract) of a paper
+METADATA_QUERY = "title abstract authors"
+
+# Chunk size used when streaming PDFs to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# (connect, read) timeouts in seconds; the read timeout applies between chunks
+DOWNLOAD_TIMEOUT = (5, 30)
+
+# Cosine similarity above which a previous query's results are reused
+SEMANTIC_CACHE_THRESHOLD = 0.95
+
+# Maximum number of past queries compared against in the semantic cache
+SEMANTIC_CACHE_SIZE = 256
+
+# Maximum length of an abstract when no section heading follows it
+MAX_ABSTRACT_CHARS = 2000
+
+_ABSTRACT_HEADING_RE = re.compile(r'\bAbstract\b[\s.:\-—]*', re.IGNORECASE)
+_INTRODUCTION_HEADING_RE = re.compile(r'\n\s*(?:1|I)?\.?\s*Introduction\b', re.IGNORECASE)
+_ARXIV_ID_RE = re.compile(r'arXiv:\s*(\d{4}\.\d{4,5})', re.IGNORECASE)
+
+# Stateless, so a single instance is shared by all queries
+_REORDER = LongContextReorder()
+
 
 class RAGAgent:
-    def __init__(self, embedding_model: str = "nomic-embed-text"):
+    def __init__(self, embedding_model: str = "nomic-embed-text", batch_size: int = 100):
         """
         Initialize the RAG agent
         
         Args:
             embedding_model: The Ollama embedding model to use
+            batch_size: Number of documents buffered before they are written to the
+                vector store in one call (50-250 works well for ChromaDB)
         """
         logger.info("Initializing RAGAgent")
-        self.embeddings = OllamaEmbeddings(
-            model=embedding_model,
-            base_url="http://localhost:11434"
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.batch_size = batch_size
+        self._pending_docs: List[Document] = []
+        self._pending_lock = threading.Lock()
+        
+        # Query result caches: exact (query, num_results) matches, and
+        # normalized query vectors for near-duplicate queries
+        self._query_cache: Dict[Tuple[str, int], List[str]] = {}
+        self._semantic_cache: List[Tuple[np.ndarray, int, List[str]]] = []
+        self._cache_lock = threading.Lock()
+        
+        # Keep-alive connections reused across PDF downloads from the same host
+        self.session = create_session()
+        
+        # Child chunks are embedded through concurrent requests to Ollama,
+        # with a persistent cache so identical chunks are only embedded once
+        self.embeddings = CachedEmbeddings(
+            ConcurrentOllamaEmbeddings(
+                model=embedding_model,
+                base_url="http://localhost:11434"
+            ),
+            model_name=embedding_model
         )
         
         # Initialize text splitters
@@ -44,9 +93,11 @@ class RAGAgent:
             chunk_overlap=50
         )
         
-        # Initialize vector store with ChromaDB
+        # Initialize vector store with an explicit ChromaDB client, so the
+        # underlying SQLite connection can be tuned for bulk ingestion
+        self.client = chromadb.PersistentClient(path="data/chroma_db")
         self.vector_store = Chroma(
-            persist_directory="data/chroma_db",
+            client=self.client,
             embedding_function=self.embeddings
         )
         
@@ -66,12 +117,14 @@ class RAGAgent:
     def extract_article_content(self, pdf_url: str, article_id: str) -> Dict[str, Any]:
         """Extract content from PDF article"""
         try:
-            # Download PDF to temporary file
+            # Stream PDF to a temporary file without buffering it in memory;
+            # the context manager returns the connection to the pool when done
             with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                response = requests.get(pdf_url)
-                response.raise_for_status()
-                temp_file.write(response.content)
                 temp_path = temp_file.name
+                with self.session.get(pdf_url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        temp_file.write(chunk)
 
             # Load PDF
             loader = PyPDFLoader(temp_path)
@@ -83,8 +136,8 @@ class RAGAgent:
             # Extract and combine text
             content = "\n\n".join(page.page_content for page in pages)
             
-            # Add to vector store
-            self.add_to_knowledge_base(content, {"source": pdf_url, "id": article_id})
+            # Add the pages to the vector store as they are, keeping page numbers
+            self.add_to_knowledge_base(pages, {"source": pdf_url, "id": article_id})
             
             return {
                 "success": True,
@@ -99,61 +152,224 @@ class RAGAgent:
                 "error": str(e)
             }
 
-    def add_to_knowledge_base(self, content: str, metadata: Dict[str, Any]) -> None:
-        """Add content to the vector store"""
+    def add_to_knowledge_base(self, documents: List[Document], metadata: Dict[str, Any]) -> None:
+        """
+        Queue documents for the vector store, writing them once a full batch is pending
+        
+        Args:
+            documents: Documents to index, e.g. the pages of a PDF
+            metadata: Metadata added to every document, overriding loader fields
+        """
+        docs = [
+            Document(page_content=doc.page_content, metadata={**doc.metadata, **metadata})
+            for doc in documents
+        ]
+        with self._pending_lock:
+            self._pending_docs.extend(docs)
+            batch_full = len(self._pending_docs) >= self.batch_size
+        logger.info(f"Queued {len(docs)} documents for knowledge base with metadata: {metadata}")
+        
+        if batch_full:
+            self.flush()
+
+    @contextmanager
+    def bulk_ingest(self):
+        """
+        Relax SQLite durability while writing a batch of documents to ChromaDB.
+        
+        WAL with synchronous=NORMAL keeps the database crash-consistent but avoids
+        an fsync on every insert. synchronous is restored on exit; WAL is a
+        persistent database setting and stays enabled. The settings apply to the
+        calling thread's connection, which is the one the batch is written through.
+        """
+        pool, conn = None, None
+        try:
+            # Internal API of chromadb, checked against the versions allowed by requirements.txt
+            from chromadb.db.impl.sqlite import SqliteDB
+            pool = self.client._system.instance(SqliteDB)._conn_pool
+            conn = pool.connect()
+            previous_synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+        except Exception as e:
+            # Ingest with default settings if the internal API changes
+            logger.warning(f"Could not tune ChromaDB SQLite settings: {e}")
+            if conn is not None:
+                pool.return_to_pool(conn)
+            conn = None
+            
+        try:
+            yield
+        finally:
+            if conn is not None:
+                try:
+                    conn.execute(f"PRAGMA synchronous={int(previous_synchronous)}")
+                except Exception as e:
+                    logger.warning(f"Could not restore ChromaDB SQLite settings: {e}")
+                finally:
+                    pool.return_to_pool(conn)
+
+    def flush(self) -> None:
+        """Write all pending documents to the vector store in a single batch"""
+        with self._pending_lock:
+            docs, self._pending_docs = self._pending_docs, []
+        if not docs:
+            return
+            
         try:
             # Split and add documents
-            self.retriever.add_documents([
-                {"page_content": content, "metadata": metadata}
-            ])
-            logger.info(f"Added content to knowledge base with metadata: {metadata}")
+            with self.bulk_ingest():
+                self.retriever.add_documents(docs, ids=None)
+            logger.info(f"Added {len(docs)} documents to knowledge base")
+            
+            # Cached query results no longer reflect the knowledge base
+            with self._cache_lock:
+                self._query_cache.clear()
+                self._semantic_cache.clear()
         except Exception as e:
-            logger.error(f"Error adding content to knowledge base: {e}")
-            raise
+            # Put the batch back in front of anything queued meanwhile, so the
+            # next flush retries it instead of the documents being lost
+            logger.error(f"Error adding content to knowledge base, keeping {len(docs)} documents pending: {e}")
+            with self._pending_lock:
+                self._pending_docs[:0] = docs
+
+    def _semantic_cache_lookup(self, query_vector: np.ndarray, num_results: int) -> Optional[List[str]]:
+        """Find the results of a previous query whose embedding is close enough to this one"""
+        with self._cache_lock:
+            for cached_vector, cached_num_results, results in self._semantic_cache:
+                if cached_num_results == num_results and float(np.dot(cached_vector, query_vector)) >= SEMANTIC_CACHE_THRESHOLD:
+                    return results
+        return None
 
     def query_knowledge_base(self, query: str, num_results: int = 5) -> List[str]:
         """Query the knowledge base for relevant content"""
         try:
+            # Make sure queued documents are searchable
+            self.flush()
+            
+            # Exact repeat of an earlier query
+            cache_key = (query, num_results)
+            with self._cache_lock:
+                cached = self._query_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+                
+            # Paraphrase of an earlier query
+            query_vector = np.asarray(self.embeddings.embed_query(query), dtype=float)
+            norm = np.linalg.norm(query_vector)
+            if norm:
+                query_vector = query_vector / norm
+            cached = self._semantic_cache_lookup(query_vector, num_results)
+            if cached is not None:
+                logger.info(f"Reusing results of a similar query for: {query}")
+                with self._cache_lock:
+                    self._query_cache[cache_key] = cached
+                return list(cached)
+            
             # Get relevant documents using invoke() instead of get_relevant_documents()
             docs = self.retriever.invoke(query)
             
-            # Reorder for better context
-            reordering = LongContextReorder()
-            reordered_docs = reordering.transform_documents(docs[:num_results])
+            # Reorder for better context; two documents or fewer stay as they are
+            docs = docs[:num_results]
+            if len(docs) > 2:
+                docs = _REORDER.transform_documents(docs)
             
             # Extract and return content
-            return [doc.page_content for doc in reordered_docs]
+            results = [doc.page_content for doc in docs]
+            with self._cache_lock:
+                self._query_cache[cache_key] = results
+                self._semantic_cache.append((query_vector, num_results, results))
+                del self._semantic_cache[:-SEMANTIC_CACHE_SIZE]
+            return list(results)
             
         except Exception as e:
             logger.error(f"Error querying knowledge base: {e}")
             return [f"Error retrieving content: {e}"]
 
-    def retrieve_abstract(self, pdf_path: str) -> str:
-        """Retrieve abstract from the indexed PDF"""
+    def _direct_child_query(self, query: str, k: int = 5,
+                            where: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """
+        Search the child chunks in Chroma directly, without loading parent documents
+        
+        Args:
+            query: The search query
+            k: Number of chunks to return
+            where: Optional Chroma metadata filter
+            
+        Returns:
+            The most similar child chunks
+        """
+        # Make sure queued documents are searchable
+        self.flush()
+        return self.vector_store.similarity_search(query, k=k, filter=where)
+
+    def retrieve_metadata(self, pdf_path: Optional[str], pdf_url: Optional[str] = None) -> Dict[str, str]:
+        """
+        Retrieve abstract, authors and link from the indexed PDF with a single query
+        
+        Args:
+            pdf_path: Local path of the PDF, if it was downloaded
+            pdf_url: Optional URL the PDF was indexed from
+            
+        Returns:
+            Dictionary with 'abstract', 'authors' and 'link' keys, left empty
+            when the PDF isn't in the knowledge base
+        """
+        metadata = {"abstract": "", "authors": "", "link": ""}
         try:
-            query = "abstract"
-            results = self.query_knowledge_base(query)
-            return results[0] if results else ""
+            # Only search this article's chunks, which carry the path or the URL
+            # they were loaded from as their source; anything else would fill in
+            # another paper's details
+            sources = [source for source in (pdf_path, pdf_url) if source]
+            if not sources:
+                return metadata
+            where = {"source": {"$in": sources}}
+            
+            # Title, authors and abstract sit in a small slice of the first page,
+            # so the child chunks are enough and the parent lookup is skipped
+            results = [doc.page_content for doc in self._direct_child_query(METADATA_QUERY, where=where)]
+            if not results:
+                return metadata
+                
+            # Default to the best match, as the separate queries used to
+            metadata["abstract"] = metadata["authors"] = results[0]
+            
+            for text in results:
+                heading = _ABSTRACT_HEADING_RE.search(text)
+                if not heading:
+                    continue
+                # The abstract runs until the introduction heading
+                body = text[heading.end():]
+                introduction = _INTRODUCTION_HEADING_RE.search(body)
+                metadata["abstract"] = (body[:introduction.start()] if introduction else body[:MAX_ABSTRACT_CHARS]).strip()
+                
+                # Authors are listed between the title and the abstract; skip emails and arXiv stamps
+                header_lines = [
+                    line.strip() for line in text[:heading.start()].splitlines()
+                    if line.strip() and "@" not in line and "arxiv" not in line.lower()
+                ]
+                if header_lines:
+                    metadata["authors"] = "\n".join(header_lines[1:6]) or header_lines[0]
+                break
+                
+            arxiv_id = _ARXIV_ID_RE.search("\n".join(results))
+            if arxiv_id:
+                metadata["link"] = f"https://arxiv.org/abs/{arxiv_id.group(1)}"
+            return metadata
+            
         except Exception as e:
-            logger.error(f"Error retrieving abstract from {pdf_path}: {e}")
-            return ""
+            logger.error(f"Error retrieving metadata from {pdf_path}: {e}")
+            return metadata
+
+    def retrieve_abstract(self, pdf_path: str) -> str:
+        """Retrieve abstract from the indexed PDF"""
+        return self.retrieve_metadata(pdf_path)["abstract"]
 
     def retrieve_authors(self, pdf_path: str) -> str:
         """Retrieve authors from the indexed PDF"""
-        try:
-            query = "authors"
-            results = self.query_knowledge_base(query)
-            return results[0] if results else ""
-        except Exception as e:
-            logger.error(f"Error retrieving authors from {pdf_path}: {e}")
-            return ""
+        return self.retrieve_metadata(pdf_path)["authors"]
 
     def retrieve_link(self, pdf_path: str) -> str:
         """Retrieve link from the indexed PDF"""
-        try:
-            query = "link"
-            results = self.query_knowledge_base(query)
-            return results[0] if results else ""
-        except Exception as e:
-            logger.error(f"Error retrieving link from {pdf_path}: {e}")
-            return ""
\ No newline at end of file
+        return self.retrieve_metadata(pdf_path)["link"]
@@ -1,22 +1,45 @@
 import os
+import hashlib
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator, Sequence, Tuple
 from duckduckgo_search import DDGS
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import re
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
+from utils.http_utils import create_session
 
 # Configure logging
 logger = logging.getLogger("SearchAgent")
 
+# arXiv identifier (e.g. 2401.01234) embedded in a URL
+_ARXIV_ID_RE = re.compile(r'(\d+\.\d+)')
+
+# Class names marking the main content block of a page
+_CLASS_RE = re.compile(r'content|article|entry|post', re.I)
+
+# Only the tags used for content extraction are built into the parse tree
+_CONTENT_STRAINER = SoupStrainer(["article", "main", "div", "p", "title"])
+
+# Maximum number of search queries in flight at once
+MAX_CONCURRENT_QUERIES = 4
+
 class SearchAgent:
     def __init__(self):
         """Initialize the search agent with DuckDuckGo"""
         logger.info("Initializing SearchAgent with DuckDuckGo")
-        self.search_engine = DDGS()
         self.max_results = 10
+        # Keep-alive connections reused across page fetches
+        self.session = create_session()
+        # Minimum time between search engine queries, in seconds
+        self.min_interval = 0.5
+        self._last_query_ts = 0.0
+        self._throttle_lock = threading.Lock()
+        # One search client per thread running queries, as clients aren't shared
+        self._local = threading.local()
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
             "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15",
@@ -27,14 +50,37 @@ class SearchAgent:
     def get_random_user_agent(self):
         return random.choice(self.user_agents)
         
-    def is_valid_arxiv_url(self, url: str) -> bool:
-        """Check if URL is from arxiv.org"""
-        try:
-            parsed = urlparse(url)
-            return parsed.netloc.endswith('arxiv.org')
-        except:
-            return False
-
+    def _throttle(self) -> None:
+        """Wait only as long as needed to keep query starts at least min_interval apart"""
+        # Reserve the next free slot under the lock, then sleep outside of it
+        with self._throttle_lock:
+            slot = max(time.monotonic(), self._last_query_ts + self.min_interval)
+            self._last_query_ts = slot
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+            
+    def warm_connection_pool(self, urls: Sequence[str] = ("https://arxiv.org/",)) -> None:
+        """
+        Open keep-alive connections ahead of the page fetches, so the DNS lookups and
+        TLS handshakes happen while the caller is busy with something else (e.g. planning)
+        
+        Args:
+            urls: URLs on the hosts that will be fetched from
+        """
+        for url in urls:
+            try:
+                self.session.head(url, headers={"User-Agent": self.get_random_user_agent()}, timeout=5)
+                logger.debug("Warmed connection pool for %s", url)
+            except Exception as e:
+                logger.debug("Could not warm connection pool for %s: %s", url, e)
+                
+    def _get_search_engine(self) -> DDGS:
+        """Search client of the current thread, created on first use"""
+        if not hasattr(self._local, "search_engine"):
+            self._local.search_engine = DDGS()
+        return self._local.search_engine
+        
     def search_articles(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Search for articles based on the search queries from the plan
@@ -46,69 +92,91 @@ class SearchAgent:
             List of dictionaries containing article information
         """
         logger.info("Starting article search...")
-        logger.info(f"Search plan: {plan}")
+        logger.info("Search plan: %s", plan)
         
-        results = []
         search_queries = plan["plan"]["search_queries"]
+        if not search_queries:
+            return []
+        # Distribute results across queries
+        max_results = self.max_results // len(search_queries)
         
-        for query in search_queries:
-            logger.info(f"Executing search query: {query}")
-            try:
-                # Focus specifically on arXiv results
-                enhanced_query = f"site:arxiv.org {query}"
-                
-                # Get search results
-                search_results = self.search_engine.text(
-                    enhanced_query,
-                    max_results=self.max_results // len(search_queries)  # Distribute results across queries
-                )
-                
-                for result in search_results:
-                    url = result.get("href", "")
-                    # Only process arXiv URLs
-                    if not self.is_valid_arxiv_url(url):
-                        continue
-                    
-                    # Extract PDF URL with improved logic
-                    pdf_url = None
-                    if '/abs/' in url:
-                        # Standard arXiv abstract URL format
-                        pdf_url = url.replace('/abs/', '/pdf/') + '.pdf'
-                    elif '/pdf/' in url:
-                        # If already a PDF URL
-                        pdf_url = url if url.endswith('.pdf') else url + '.pdf'
-                    else:
-                        # Try to extract arXiv ID and construct PDF URL
-                        import re
-                        arxiv_id_match = re.search(r'(\d+\.\d+)', url)
-                        if arxiv_id_match:
-                            arxiv_id = arxiv_id_match.group(1)
-                            pdf_url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-                        
-                    article = {
-                        "title": result.get("title", ""),
-                        "url": url,
-                        "snippet": result.get("body", ""),
-                        "source": "arxiv.org",
-                        "query": query,
-                        "pdf_url": pdf_url
-                    }
-                    
-                    # Only add if URL is not already in results
-                    if article["url"] and not any(r["url"] == article["url"] for r in results):
-                        results.append(article)
-                        logger.info(f"Found article: {article['title']}")
-                        logger.debug(f"Article details: {article}")
-                        
-                # Be nice to the search engine
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Error searching for query '{query}': {e}")
+        # Queries are independent, so they run concurrently; starts are still throttled
+        with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_QUERIES, len(search_queries))) as executor:
+            query_results = list(executor.map(lambda query: self._search_query(query, max_results), search_queries))
+        
+        # Merge in query order, keeping the first occurrence of each URL
+        results = []
+        seen_urls = set()
+        for articles in query_results:
+            for article in articles:
+                if article["url"] not in seen_urls:
+                    seen_urls.add(article["url"])
+                    results.append(article)
+                    logger.info(f"Found article: {article['title']}")
+                    logger.debug("Article details: %s", article)
                 
         logger.info(f"Search completed. Found {len(results)} unique articles")
         return results
         
+    def _search_query(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        """
+        Run a single search query
+        
+        Args:
+            query: The search query
+            max_results: Maximum number of search results to request
+            
+        Returns:
+            List of dictionaries containing information on the arXiv articles found
+        """
+        logger.info(f"Executing search query: {query}")
+        articles = []
+        try:
+            # Focus specifically on arXiv results
+            enhanced_query = f"site:arxiv.org {query}"
+            
+            # Get search results, without hammering the search engine
+            self._throttle()
+            search_results = self._get_search_engine().text(enhanced_query, max_results=max_results)
+            
+            for result in search_results:
+                url = result.get("href", "")
+                # Only process arXiv URLs; parse each URL once
+                try:
+                    netloc = urlparse(url).netloc
+                except ValueError:
+                    continue
+                if not url or not netloc.endswith('arxiv.org'):
+                    continue
+                
+                # Extract PDF URL with improved logic
+                pdf_url = None
+                if '/abs/' in url:
+                    # Standard arXiv abstract URL format
+                    pdf_url = url.replace('/abs/', '/pdf/') + '.pdf'
+                elif '/pdf/' in url:
+                    # If already a PDF URL
+                    pdf_url = url if url.endswith('.pdf') else url + '.pdf'
+                else:
+                    # Try to extract arXiv ID and construct PDF URL
+                    arxiv_id_match = _ARXIV_ID_RE.search(url)
+                    if arxiv_id_match:
+                        arxiv_id = arxiv_id_match.group(1)
+                        pdf_url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+                    
+                articles.append({
+                    "title": result.get("title", ""),
+                    "url": url,
+                    "snippet": result.get("body", ""),
+                    "source": "arxiv.org",
+                    "query": query,
+                    "pdf_url": pdf_url
+                })
+            
+        except Exception as e:
+            logger.error(f"Error searching for query '{query}': {e}")
+        return articles
+        
     def _extract_domain(self, url: str) -> str:
         """Extract the domain from a URL"""
         try:
@@ -130,17 +198,17 @@ class SearchAgent:
         headers = {"User-Agent": self.get_random_user_agent()}
         
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, headers=headers, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, "html.parser")
+            soup = BeautifulSoup(response.content, "lxml", parse_only=_CONTENT_STRAINER)
             
             # Extract the main content (simplified approach)
             # In a real implementation, site-specific extractors would improve this
             title = soup.title.string if soup.title else ""
             
             # Try to get article content from common article tags
-            content_tags = soup.find_all(["article", "main", "div"], class_=lambda c: c and any(x in str(c).lower() for x in ["content", "article", "entry", "post"]))
+            content_tags = soup.find_all(["article", "main", "div"], class_=_CLASS_RE)
             
             paragraphs = []
             if content_tags:
@@ -157,7 +225,7 @@ class SearchAgent:
             content = "\n\n".join(paragraphs[:20])  # Limit to first 20 paragraphs
             
             logger.info(f"Successfully fetched content ({len(content)} characters)")
-            logger.debug(f"Content preview: {content[:200]}...")
+            logger.debug("Content preview: %s...", content[:200])
             
             return {
                 "title": title,
@@ -174,4 +242,67 @@ class SearchAgent:
                 "content": "",
                 "content_length": 0,
                 "error": str(e)
-            }
\ No newline at end of file
+            }
+            
+    def fetch_many(self, urls: List[str], max_workers: int = 8) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Fetch the content of several articles concurrently
+        
+        Args:
+            urls: The URLs of the articles
+            max_workers: Maximum number of concurrent requests
+            
+        Yields:
+            (URL, article content dictionary) as each fetch completes, so callers can
+            handle an article without waiting for, or holding on to, the others
+        """
+        if not urls:
+            return
+            
+        # No point spawning threads that would never get a URL
+        max_workers = min(max_workers, len(urls))
+        logger.info(f"Fetching content for {len(urls)} articles with {max_workers} workers")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_url = {executor.submit(self.fetch_article_content, url): url for url in urls}
+            for future in as_completed(future_to_url):
+                url = future_to_url[future]
+                try:
+                    yield url, future.result()
+                except Exception as e:
+                    # One failed fetch must not abort the batch
+                    logger.error(f"Error fetching article from {url}: {e}")
+                    yield url, {
+                        "title": "",
+                        "url": url,
+                        "content": "",
+                        "content_length": 0,
+                        "error": str(e)
+                    }
+
+    def fetch_many_to_files(self, urls: List[str], out_dir: str, max_workers: int = 8) -> Dict[str, str]:
+        """
+        Fetch the content of several articles concurrently, writing each one to disk
+        as soon as it arrives so the contents are never held in memory all at once
+        
+        Args:
+            urls: The URLs of the articles
+            out_dir: Directory for the text files, named by a hash of the URL
+            max_workers: Maximum number of concurrent requests
+            
+        Returns:
+            Mapping of URL to the path of its text file, for articles with content
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        url_to_filepath = {}
+        for url, article in self.fetch_many(urls, max_workers=max_workers):
+            if not article["content"]:
+                continue
+            filepath = os.path.join(out_dir, f"{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}.txt")
+            try:
+                # Same "Title:" header layout as other article text files
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(f"Title: {article['title'] or ''}\nURL: {url}\n\n{article['content']}")
+                url_to_filepath[url] = filepath
+            except OSError as e:
+                logger.error(f"Error saving article from {url}: {e}")
+        return url_to_filepath
@@ -1,40 +1,71 @@
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
+
+# Columns of the detailed articles CSV, in order
+DETAILS_COLUMNS = ['title', 'authors', 'link', 'abstract', 'local_pdf_path']
+
+
+def _read_csv(csv_path: str) -> pd.DataFrame:
+    """Read a CSV file with pyarrow's multithreaded reader, falling back to pandas"""
+    if pa_csv is None:
+        return pd.read_csv(csv_path)
+    # Snippets and abstracts contain quoted newlines; empty strings become NaN as with pandas
+    table = pa_csv.read_csv(
+        csv_path,
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(strings_can_be_null=True)
+    )
+    return table.to_pandas()
+
+
 class TransformationAgent:
     def __init__(self, data_dir: str):
         self.data_dir = data_dir
 
-    def update_csv_with_abstracts(self, csv_path: str, abstracts: List[Dict[str, Any]]) -> str:
+    def add_abstracts(self, articles: List[Dict[str, Any]], abstracts: List[Dict[str, Any]],
+                      url_to_raw_filepath: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
         """
-        Update the CSV file with article abstracts
+        Attach generated abstracts to articles in memory
         
         Args:
-            csv_path: Path to the CSV file
+            articles: Article dictionaries with their local_pdf_path
             abstracts: List of dictionaries containing file paths and abstracts
+            url_to_raw_filepath: Mapping of URL to the fetched page file, which the
+                abstract of an article without a PDF was generated from
             
         Returns:
-            Path to the updated CSV file
+            Copies of the articles with an abstract where one was generated
         """
-        try:
-            # Read the CSV file
-            df = pd.read_csv(csv_path)
-            
-            # Create a mapping from file paths to abstracts
-            file_to_abstract = {item["file_path"]: item["abstract"] for item in abstracts if "file_path" in item and "abstract" in item}
-            
-            # Add abstracts column based on the local_pdf_path (fix the field name)
-            df['abstract'] = df['local_pdf_path'].map(file_to_abstract)
-            
-            # Save the updated CSV
-            df.to_csv(csv_path, index=False)
-            
-            return csv_path
+        # Abstracts keyed by local PDF path; the last result wins for repeated files.
+        # Failed generations are left out, so the RAG lookup can still fill them in.
+        by_path = {
+            item["file_path"]: item["abstract"]
+            for item in abstracts
+            if item.get("file_path") and item.get("abstract")
+            and "error" not in item and not str(item["abstract"]).startswith("Error")
+        }
+        
+        url_to_raw_filepath = url_to_raw_filepath or {}
+        merged = []
+        for article in articles:
+            path = article.get('local_pdf_path') or url_to_raw_filepath.get(article.get('url'))
+            abstract = by_path.get(path)
+            merged.append({**article, 'abstract': abstract} if abstract else article)
+        return merged
             
-        except Exception as e:
-            print(f"Error updating CSV with abstracts: {e}")
-            return csv_path
+    @staticmethod
+    def _column_or_default(df: pd.DataFrame, column: str, default: str) -> pd.Series:
+        """Get a column with missing values replaced by a default"""
+        if column in df.columns:
+            return df[column].fillna(default)
+        return pd.Series(default, index=df.index)
             
     def generate_summary_report(self, csv_path: str, topic: str) -> Dict[str, Any]:
         """
@@ -49,7 +80,7 @@ class TransformationAgent:
         """
         try:
             # Read the CSV file
-            df = pd.read_csv(csv_path)
+            df = _read_csv(csv_path)
             
             # Calculate summary statistics
             total_articles = len(df)
@@ -57,20 +88,12 @@ class TransformationAgent:
             sources = df['source'].value_counts().to_dict()
             
             # Get article titles with abstracts
-            articles_with_abstracts_list = []
-            for _, row in df.iterrows():
-                if pd.notna(row.get('abstract')):
-                    articles_with_abstracts_list.append({
-                        'title': row.get('title', 'Unknown Title'),
-                        'source': row.get('source', 'Unknown Source'),
-                        'has_abstract': True
-                    })
-                else:
-                    articles_with_abstracts_list.append({
-                        'title': row.get('title', 'Unknown Title'),
-                        'source': row.get('source', 'Unknown Source'),
-                        'has_abstract': False
-                    })
+            summary_df = pd.DataFrame({
+                'title': self._column_or_default(df, 'title', 'Unknown Title'),
+                'source': self._column_or_default(df, 'source', 'Unknown Source'),
+                'has_abstract': df['abstract'].notna()
+            })
+            articles_with_abstracts_list = summary_df.to_dict(orient='records')
             
             # Create summary report
             report = {
@@ -97,39 +120,29 @@ class TransformationAgent:
         import logging
         logger = logging.getLogger(__name__)
         
-        # Process only articles that have local PDF paths
+        # Process only articles that have a local PDF or an abstract from their page
         processed_articles = []
         
         for article in articles:
-            # Skip articles without PDF paths
-            if not article.get('local_pdf_path'):
-                logger.warning(f"Skipping article without PDF path: {article.get('title', 'Unknown')}")
+            # Skip articles with nothing to report on
+            if not article.get('local_pdf_path') and not article.get('abstract'):
+                logger.warning(f"Skipping article without PDF or abstract: {article.get('title', 'Unknown')}")
                 continue
                 
             try:
                 article_copy = article.copy()
                 
-                if not article_copy.get('abstract'):
-                    # Retrieve abstract using RAGAgent
-                    logger.info(f"Retrieving abstract for: {article_copy.get('title', 'Unknown')}")
-                    abstract = rag_agent.retrieve_abstract(article_copy['local_pdf_path'])
-                    article_copy['abstract'] = abstract
-
-                if not article_copy.get('authors'):
-                    # Retrieve authors using RAGAgent
-                    logger.info(f"Retrieving authors for: {article_copy.get('title', 'Unknown')}")
-                    authors = rag_agent.retrieve_authors(article_copy['local_pdf_path'])
-                    article_copy['authors'] = authors
-
-                if not article_copy.get('link'):
-                    # If article has a URL, use it as the link
-                    if article_copy.get('url'):
-                        article_copy['link'] = article_copy['url']
-                    else:
-                        # Retrieve link using RAGAgent
-                        logger.info(f"Retrieving link for: {article_copy.get('title', 'Unknown')}")
-                        link = rag_agent.retrieve_link(article_copy['local_pdf_path'])
-                        article_copy['link'] = link
+                # If article has a URL, use it as the link
+                if not article_copy.get('link') and article_copy.get('url'):
+                    article_copy['link'] = article_copy['url']
+                
+                missing_fields = [field for field in ('abstract', 'authors', 'link') if not article_copy.get(field)]
+                if missing_fields:
+                    # Retrieve all missing details with a single RAGAgent lookup
+                    logger.info(f"Retrieving {', '.join(missing_fields)} for: {article_copy.get('title', 'Unknown')}")
+                    metadata = rag_agent.retrieve_metadata(article_copy.get('local_pdf_path'), article_copy.get('pdf_url'))
+                    for field in missing_fields:
+                        article_copy[field] = metadata[field]
                         
                 processed_articles.append(article_copy)
                 
@@ -147,18 +160,18 @@ class TransformationAgent:
 
     def save_articles_to_csv(self, articles: List[Dict[str, Any]]) -> str:
         """Save the collected articles to a CSV file"""
-        # Create DataFrame from articles
-        df = pd.DataFrame(articles)
+        csv_path = os.path.join(self.data_dir, 'articles_details.csv')
         
-        # Select and reorder columns
-        columns = ['title', 'authors', 'link', 'abstract', 'local_pdf_path']
-        for col in columns:
-            if col not in df.columns:
-                df[col] = ''
-                
-        df = df[columns]
+        # Select and reorder columns, missing values become empty strings
+        columns = {
+            col: ['' if article.get(col) is None else str(article.get(col)) for article in articles]
+            for col in DETAILS_COLUMNS
+        }
         
-        # Save to CSV
-        csv_path = os.path.join(self.data_dir, 'articles_details.csv')
-        df.to_csv(csv_path, index=False)
+        if pa_csv is None:
+            pd.DataFrame(columns, columns=DETAILS_COLUMNS).to_csv(csv_path, index=False)
+        else:
+            # Written straight from columns with pyarrow's multithreaded writer
+            table = pa.table({col: pa.array(values, type=pa.string()) for col, values in columns.items()})
+            pa_csv.write_csv(table, csv_path)
         return csv_path
\ No newline at end of file
@@ -1,18 +1,26 @@
 import logging
 from typing import Dict, List, Any, Optional
 import os
-from dotenv import load_dotenv
-import pandas as pd
-from utils.model_adapter import get_llm_instance
+from utils.model_adapter import get_llm_instance, get_text_extractor
+from utils import llm_cache
 from agents.rag_agent import RAGAgent
 
 logger = logging.getLogger("WritingAgent")
-load_dotenv()
+
+# Bump when the section prompt template changes so cached responses are invalidated
+PROMPT_VERSION = "v1"
 
 class WritingAgent:
-    def __init__(self, provider: str = "openai", model_id: str = "gpt-3.5-turbo", api_key: Optional[str] = None):
-        self.llm = get_llm_instance(provider, model_id, api_key)
-        self.rag_agent = RAGAgent()
+    def __init__(self, provider: str = "openai", model_id: str = "gpt-3.5-turbo", api_key: Optional[str] = None,
+                 llm: Optional[Any] = None, rag_agent: Optional[RAGAgent] = None):
+        self.provider = provider
+        self.model_id = model_id
+        self.llm = llm if llm is not None else get_llm_instance(provider, model_id, api_key)
+        self._extract = get_text_extractor(self.llm)
+        # Sampling temperature, part of the cache key since it changes the output
+        self.temperature = getattr(self.llm, "temperature", None)
+        # Share the knowledge base filled during abstract generation when given
+        self.rag_agent = rag_agent if rag_agent is not None else RAGAgent()
 
     def write_section(self, section_name: str, section_points: List[str], relevant_texts: List[str]) -> str:
         """Write a section of the academic report"""
@@ -26,10 +34,17 @@ class WritingAgent:
         Follow academic writing style and use in-text citations in APA format.
         """
         
+        # Re-runs on the same topic and sources produce the same prompt
+        cache_key = llm_cache.make_key(PROMPT_VERSION, self.provider, self.model_id, self.temperature, prompt)
+        cached_section = llm_cache.get(cache_key)
+        if cached_section is not None:
+            logger.info(f"Using cached {section_name} section")
+            return cached_section
+        
         try:
-            response = self.llm.invoke(prompt)
-            content = response.content if hasattr(response, 'content') else response
-            return content
+            section = self._extract(self.llm.invoke(prompt))
+            llm_cache.put(cache_key, section, prompt_version=PROMPT_VERSION, model_id=self.model_id)
+            return section
         except Exception as e:
             logger.error(f"Error writing {section_name} section: {e}")
             return f"Error writing {section_name} section: {e}"
@@ -47,6 +62,8 @@ class WritingAgent:
     def write_report(self, research_plan: Dict[str, Any], csv_path: str) -> Dict[str, Any]:
         """Write complete academic report with LaTeX formatting"""
         try:
+            import pandas as pd
+            
             # Read article information
             df = pd.read_csv(csv_path)
             latex_plan = research_plan.get('plan', {}).get('latex_report_plan', {})
@@ -4,20 +4,43 @@ import os
 import time
 import json
 from dotenv import load_dotenv
-from workflow_manager import ResearchWorkflow
+from workflow_manager import ResearchWorkflow, WORKFLOW_STEPS, BATCH_API_THRESHOLD
 import traceback
 from utils.model_utils import get_available_ollama_models, get_openai_model_options
 import logging
+import atexit
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def configure_logging() -> None:
+    """Log INFO and above to the console and to a rotating file written off the UI thread"""
+    root = logging.getLogger()
+    # Streamlit re-executes this script on every rerun; configure only once per process
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+        
+    file_handler = RotatingFileHandler('research_workflow.log', maxBytes=5_000_000, backupCount=3, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format=LOG_FORMAT,
+        handlers=[
+            logging.StreamHandler(),  # Output to console
+            QueueHandler(log_queue)  # Also save to file, from the listener thread
+        ],
+        force=True
+    )
 
 # Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),  # Output to console
-        logging.FileHandler('research_workflow.log')  # Also save to file
-    ]
-)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +58,16 @@ st.set_page_config(
 # Create data directory if it doesn't exist
 os.makedirs("data", exist_ok=True)
 
+@st.cache_data(show_spinner=False)
+def _load_csv(path: str, mtime: float) -> pd.DataFrame:
+    """Read a CSV once per file version; mtime is part of the cache key"""
+    return pd.read_csv(path)
+
+@st.cache_data(show_spinner=False)
+def _csv_bytes(path: str, mtime: float) -> bytes:
+    """CSV download payload, built from the cached DataFrame once per file version"""
+    return _load_csv(path, mtime).to_csv(index=False).encode("utf-8")
+
 def main():
     # Header
     st.title("🔍 Multi-Agent Research Assistant")
@@ -53,6 +86,7 @@ def main():
         
         api_key = None
         model_id = None
+        abstract_batch_mode = "sync"
         
         # Display model options based on provider
         if model_provider == "OpenAI":
@@ -62,18 +96,29 @@ def main():
             selected_model_name = st.selectbox("Select OpenAI Model", model_names)
             
             # Find the selected model
-            selected_model = next((m for m in openai_models if m["name"] == selected_model_name), openai_models[0])
+            models_by_name = {model["name"]: model for model in openai_models}
+            selected_model = models_by_name.get(selected_model_name, openai_models[0])
             model_id = selected_model["id"]
             
             # API key input for OpenAI
             api_key = st.text_input("OpenAI API Key", type="password", 
                                   help="Enter your OpenAI API key here. It will be stored temporarily in the .env file.")
             
-            # Save API key to .env if provided
+            # Save API key to .env if provided, only when it changed since the last rerun
             if api_key:
-                with open(".env", "w") as env_file:
-                    env_file.write(f"OPENAI_API_KEY={api_key}\n")
+                if api_key != st.session_state.get("_saved_api_key"):
+                    with open(".env", "w") as env_file:
+                        env_file.write(f"OPENAI_API_KEY={api_key}\n")
+                    st.session_state._saved_api_key = api_key
                 st.success("API key saved temporarily!")
+                
+            # The Batch API halves the cost of abstracts for large searches, at the price of latency
+            batch_api = st.checkbox(
+                "Use the OpenAI Batch API for abstracts",
+                help=f"Half price when there are more than {BATCH_API_THRESHOLD} articles, but the "
+                     "run waits for the batch, and falls back to direct calls if it takes too long."
+            )
+            abstract_batch_mode = "openai_batch" if batch_api else "sync"
         else:
             # Ollama model selection
             try:
@@ -91,7 +136,8 @@ def main():
                 
                 # Find the selected model
                 if ollama_models and selected_model_name != "No models found":
-                    selected_model = next((m for m in ollama_models if m["name"] == selected_model_name), ollama_models[0])
+                    models_by_name = {model["name"]: model for model in ollama_models}
+                    selected_model = models_by_name.get(selected_model_name, ollama_models[0])
                     model_id = selected_model["name"]
                     st.success(f"Using local Ollama model: {model_id}")
                 else:
@@ -121,6 +167,10 @@ def main():
     is_valid_model = (model_provider == "OpenAI" and api_key and model_id) or \
                      (model_provider == "Ollama (Local)" and model_id is not None and model_id != "No models found")
     
+    # Interrupted runs continue from their last checkpoint unless a fresh start is asked for
+    resume_run = st.checkbox("Resume an interrupted run on this topic", value=True,
+                             help="Uncheck to discard the saved progress and start the research over")
+    
     # Start research button
     start_research = st.button("Start Research", type="primary", disabled=not (topic and is_valid_model))
     
@@ -154,11 +204,14 @@ def main():
                 # Initialize workflow with selected model
                 provider = "openai" if model_provider == "OpenAI" else "ollama"
                 
+                progress_queue = queue.Queue()
                 workflow = ResearchWorkflow(
                     data_dir="data",
                     model_provider=provider,
                     model_id=model_id,
-                    api_key=api_key
+                    api_key=api_key,
+                    abstract_batch_mode=abstract_batch_mode,
+                    progress_queue=progress_queue
                 )
                 
                 # Create progress visualization
@@ -167,10 +220,57 @@ def main():
                     st.info("Running complete research workflow. This may take some time...")
                     progress_bar = st.progress(0)
                 
-                # Actually run the workflow (this might take some time)
+                # Run the workflow in a background thread (this might take some time);
+                # it reports completed steps and abstracts through the progress queue
+                outcome = {}
+                
+                def run_workflow():
+                    try:
+                        results = {"topic": topic}
+                        for step, update in workflow.stream(topic, resume=resume_run):
+                            results.update(update)
+                            if step in WORKFLOW_STEPS:
+                                progress_queue.put(("step", step))
+                        outcome["results"] = results
+                    except Exception as e:
+                        outcome["error"] = e
+                        
+                worker = threading.Thread(target=run_workflow, daemon=True)
+                worker.start()
+                
+                # Redraw the progress bar at most ~5 times a second, with the latest events only
                 with st.spinner("Running research workflow..."):
-                    results = workflow.run(topic)
-                    st.session_state.results = results
+                    steps_done = 0
+                    # Share of the abstracts generated, kept until the abstracting step completes
+                    abstract_fraction = 0.0
+                    while worker.is_alive() or not progress_queue.empty():
+                        try:
+                            events = [progress_queue.get(timeout=0.2)]
+                        except queue.Empty:
+                            continue
+                        while not progress_queue.empty():
+                            events.append(progress_queue.get_nowait())
+                            
+                        text = None
+                        for event in events:
+                            if event[0] == "step":
+                                steps_done += 1
+                                if event[1] == "abstracting":
+                                    abstract_fraction = 0.0
+                                text = f"Completed {event[1].replace('_', ' ')} ({steps_done}/{len(WORKFLOW_STEPS)})"
+                            elif event[0] == "restored":
+                                steps_done = event[1]
+                                text = f"Resuming interrupted run ({steps_done}/{len(WORKFLOW_STEPS)})"
+                            elif event[0] == "abstract":
+                                abstract_fraction = event[1] / event[2]
+                                text = f"Generating abstracts ({event[1]}/{event[2]})"
+                        fraction = (steps_done + abstract_fraction) / len(WORKFLOW_STEPS)
+                        progress_bar.progress(min(fraction, 1.0), text=text)
+                    worker.join()
+                    
+                    if "error" in outcome:
+                        raise outcome["error"]
+                    st.session_state.results = outcome["results"]
                     progress_bar.progress(100)
                 
                 st.success("Research completed successfully!")
@@ -252,32 +352,29 @@ def main():
             if "final_csv_path" in results:
                 csv_path = results["final_csv_path"]
                 if os.path.exists(csv_path):
-                    df = pd.read_csv(csv_path)
+                    mtime = os.path.getmtime(csv_path)
+                    df = _load_csv(csv_path, mtime)
                     
                     # Show download button for the CSV
                     csv_filename = os.path.basename(csv_path)
-                    with open(csv_path, "rb") as file:
-                        st.download_button(
-                            label="Download CSV results",
-                            data=file,
-                            file_name=csv_filename,
-                            mime="text/csv"
-                        )
+                    st.download_button(
+                        label="Download CSV results",
+                        data=_csv_bytes(csv_path, mtime),
+                        file_name=csv_filename,
+                        mime="text/csv"
+                    )
                     
                     # Display dataframe with abstracts
                     st.subheader("Articles with Abstracts")
-                    st.dataframe(df["title", "authors", "link", "abstract"].dropna(subset=["abstract"]), use_container_width=True)
+                    st.dataframe(df[["title", "authors", "link", "abstract"]].dropna(subset=["abstract"]), use_container_width=True)
 
         # Display LaTeX report
         st.header("4. LaTeX Report")
         if "latex_report" in results:
             latex_report = results["latex_report"]
-            report_path = results.get("report_path")
+            report_content = results.get("latex_report_content")
             
-            if report_path and os.path.exists(report_path):
-                with open(report_path, 'r', encoding='utf-8') as f:
-                    report_content = f.read()
-                    
+            if report_content:
                 st.code(report_content, language='latex')
                 
                 # Download LaTeX button
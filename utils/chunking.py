@@ -0,0 +1,131 @@
+from functools import lru_cache
+from typing import List, Tuple
+import tiktoken
+
+# Separators tried in order when a piece of text is too large to keep whole
+SEPARATORS = ["\n\n", "\n", ". "]
+
+# Share of the token budget spent on the start and the end of the text
+HEAD_FRACTION = 0.4
+TAIL_FRACTION = 0.3
+
+# Context window sizes in tokens, matched by model ID prefix (longest prefix first)
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+
+# Assumed context window of unknown models, e.g. most Ollama models
+DEFAULT_CONTEXT_TOKENS = 8192
+
+@lru_cache(maxsize=None)
+def get_encoding(model_id: str = "gpt-3.5-turbo") -> tiktoken.Encoding:
+    """
+    Get the tiktoken encoding for a model, falling back to cl100k_base
+    for models tiktoken doesn't know (e.g. Ollama models)
+    """
+    try:
+        return tiktoken.encoding_for_model(model_id)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+def get_context_window(model_id: str) -> int:
+    """Get the context window size of a model in tokens"""
+    for prefix in sorted(MODEL_CONTEXT_TOKENS, key=len, reverse=True):
+        if model_id.startswith(prefix):
+            return MODEL_CONTEXT_TOKENS[prefix]
+    return DEFAULT_CONTEXT_TOKENS
+
+def count_tokens(text: str, model_id: str = "gpt-3.5-turbo") -> int:
+    """Count the tokens in a text for the given model"""
+    return len(get_encoding(model_id).encode(text, disallowed_special=()))
+
+def _split_recursive(text: str, max_tokens: int, encoding: tiktoken.Encoding, separators: List[str],
+                     trailing: str = "") -> List[Tuple[str, str]]:
+    """
+    Split text into pieces of at most max_tokens, preferring coarse separators.
+    Each piece comes with the separator that followed it in the text, so
+    neighbouring pieces can be joined back the way they were; trailing is the
+    separator that followed the whole text.
+    """
+    if len(encoding.encode(text, disallowed_special=())) <= max_tokens:
+        return [(text, trailing)]
+    if not separators:
+        # No separator left: cut on token boundaries
+        tokens = encoding.encode(text, disallowed_special=())
+        starts = range(0, len(tokens), max_tokens)
+        return [
+            (encoding.decode(tokens[i:i + max_tokens]), trailing if i == starts[-1] else "")
+            for i in starts
+        ]
+
+    separator, rest = separators[0], separators[1:]
+    parts = text.split(separator)
+    pieces = []
+    for i, part in enumerate(parts):
+        if part.strip():
+            pieces.extend(_split_recursive(part, max_tokens, encoding, rest,
+                                           trailing if i == len(parts) - 1 else separator))
+    return pieces
+
+def recursive_truncate(text: str, max_tokens: int = 8000, model_id: str = "gpt-3.5-turbo") -> str:
+    """
+    Shrink a text to fit a token budget while keeping its most useful parts.
+
+    The start and the end of the text are kept (introduction and conclusions),
+    and the remaining budget is filled with the longest paragraphs from the middle.
+
+    Args:
+        text: The text to truncate
+        max_tokens: Maximum number of tokens to keep
+        model_id: Model whose tokenizer is used for counting
+
+    Returns:
+        The text unchanged if it fits, otherwise the selected pieces joined
+        with "..." markers where content was dropped
+    """
+    encoding = get_encoding(model_id)
+    if len(encoding.encode(text, disallowed_special=())) <= max_tokens:
+        return text
+
+    pieces = _split_recursive(text, max(1, max_tokens // 10), encoding, SEPARATORS)
+    sizes = [len(encoding.encode(piece, disallowed_special=())) for piece, _ in pieces]
+
+    # Take pieces from the head, then from the tail, within their share of the budget
+    head_budget = int(max_tokens * HEAD_FRACTION)
+    head_end, used = 0, 0
+    while head_end < len(pieces) and used + sizes[head_end] <= head_budget:
+        used += sizes[head_end]
+        head_end += 1
+
+    tail_budget = int(max_tokens * TAIL_FRACTION)
+    tail_start, tail_used = len(pieces), 0
+    while tail_start > head_end and tail_used + sizes[tail_start - 1] <= tail_budget:
+        tail_used += sizes[tail_start - 1]
+        tail_start -= 1
+    used += tail_used
+
+    # Fill the rest of the budget with the longest middle paragraphs
+    selected = set(range(head_end)) | set(range(tail_start, len(pieces)))
+    for index in sorted(range(head_end, tail_start), key=lambda i: sizes[i], reverse=True):
+        if used + sizes[index] <= max_tokens:
+            selected.add(index)
+            used += sizes[index]
+
+    # Rebuild in document order: neighbours are joined with the separator they
+    # were split on, and each gap becomes a "..." paragraph
+    output = []
+    previous = -1
+    for index in sorted(selected):
+        if index != previous + 1:
+            output.append("\n\n...\n\n" if output else "...\n\n")
+        elif output:
+            output.append(pieces[previous][1])
+        output.append(pieces[index][0])
+        previous = index
+    if previous != len(pieces) - 1:
+        output.append("\n\n...")
+    return "".join(output)
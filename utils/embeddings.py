@@ -0,0 +1,144 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from langchain_community.embeddings import OllamaEmbeddings
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EMBED_CACHE_PATH = os.path.join("data", "embed_cache.sqlite")
+
+# Keeps IN (...) queries under SQLite's host parameter limit
+_LOOKUP_CHUNK_SIZE = 500
+
+class ConcurrentOllamaEmbeddings(OllamaEmbeddings):
+    """
+    Ollama embeddings that send sub-batches of documents concurrently.
+    Ollama serves embedding requests in parallel, so ingesting a large PDF
+    is no longer bound by one HTTP round-trip per chunk.
+    """
+
+    max_workers: int = 8
+    """Maximum number of sub-batches embedded at the same time"""
+    sub_batch_size: int = 32
+    """Number of texts sent by each worker"""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, preserving input order.
+
+        Args:
+            texts: The texts to embed
+
+        Returns:
+            One embedding per text
+        """
+        if len(texts) <= self.sub_batch_size:
+            return super().embed_documents(texts)
+
+        sub_batches = [texts[i:i + self.sub_batch_size] for i in range(0, len(texts), self.sub_batch_size)]
+        embed_sub_batch = super().embed_documents
+        logger.debug("Embedding %d texts in %d concurrent sub-batches", len(texts), len(sub_batches))
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(sub_batches))) as executor:
+            results = executor.map(embed_sub_batch, sub_batches)
+            return [embedding for sub_batch in results for embedding in sub_batch]
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model with a persistent SQLite cache keyed by a hash
+    of (model name, text). Embeddings are deterministic for a given model,
+    so repeated chunks (re-runs, shared boilerplate) are never re-embedded.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, db_path: str = DEFAULT_EMBED_CACHE_PATH):
+        """
+        Args:
+            embeddings: The underlying embedding model
+            model_name: Name of the model, part of the cache key
+            db_path: Path to the SQLite cache file
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and make sure the table exists"""
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS embed_cache (text_hash TEXT PRIMARY KEY, vector BLOB)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _key(self, text: str) -> str:
+        return hashlib.blake2b(f"{self.model_name}|{text}".encode(), digest_size=16).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given keys in bulk"""
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                for i in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+                    chunk = keys[i:i + _LOOKUP_CHUNK_SIZE]
+                    placeholders = ",".join("?" * len(chunk))
+                    for key, blob in conn.execute(
+                        f"SELECT text_hash, vector FROM embed_cache WHERE text_hash IN ({placeholders})", chunk
+                    ):
+                        found[key] = array("d", blob).tolist()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading from embedding cache: {e}")
+        return found
+
+    def _store(self, items: Dict[str, List[float]]) -> None:
+        """Write vectors to the cache"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embed_cache (text_hash, vector) VALUES (?, ?)",
+                    [(key, array("d", vector).tobytes()) for key, vector in items.items()]
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing to embedding cache: {e}")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, only sending cache misses to the underlying model"""
+        keys = [self._key(text) for text in texts]
+        cached = self._lookup(list(set(keys)))
+
+        # Embed each distinct missing text once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        if missing:
+            logger.debug("Embedding cache: %d hits, %d misses", len(texts) - len(missing), len(missing))
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_items = dict(zip(missing.keys(), vectors))
+            self._store(new_items)
+            cached.update(new_items)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing a cached vector when available"""
+        key = self._key(text)
+        cached = self._lookup([key])
+        if key in cached:
+            return cached[key]
+        vector = self.embeddings.embed_query(text)
+        self._store({key: vector})
+        return vector
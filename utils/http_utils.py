@@ -0,0 +1,33 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Transient statuses worth retrying: rate limiting and server-side errors
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(pool_connections: int = 16, pool_maxsize: int = 32, retries: int = 3) -> requests.Session:
+    """
+    Create a requests session with pooled keep-alive connections and retries.
+    
+    Args:
+        pool_connections: Number of hosts to keep connection pools for
+        pool_maxsize: Maximum number of connections kept per host
+        retries: Number of retries on connection errors and transient statuses
+        
+    Returns:
+        The configured session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUS_CODES,
+        # Hand the last response back so callers' raise_for_status reports it
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
@@ -0,0 +1,25 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError subclasses this, so it catches errors from either parser
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON text with orjson, falling back to the standard library"""
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize an object to JSON text, falling back to str() for unknown types"""
+    if orjson is None:
+        return json.dumps(obj, default=str, ensure_ascii=False,
+                          indent=2 if indent else None, separators=None if indent else (",", ":"))
+    return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0).decode()
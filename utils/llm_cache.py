@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Set
+
+logger = logging.getLogger("LLMCache")
+
+CACHE_FILENAME = "llm_cache.sqlite"
+DEFAULT_CACHE_PATH = os.path.join("data", CACHE_FILENAME)
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def make_key(*parts) -> str:
+    """
+    Build a cache key from the inputs that determine an LLM response.
+
+    Args:
+        parts: Values such as prompt version, provider, model ID and prompt
+
+    Returns:
+        Hex digest identifying the inputs
+    """
+    return hashlib.blake2b("|".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+
+
+class LLMCache:
+    """
+    Disk-backed cache of LLM responses stored in SQLite.
+    Entries expire after a TTL so stale answers are eventually regenerated.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH):
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Keys present in the database, so misses never touch SQLite
+        self._known_keys: Set[str] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and make sure the table exists"""
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # The primary key on input_hash doubles as the lookup index
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    input_hash TEXT PRIMARY KEY,
+                    prompt_version TEXT,
+                    model_id TEXT,
+                    response TEXT,
+                    created_at REAL,
+                    expires_at REAL
+                )
+                """
+            )
+            # Drop expired entries, which would otherwise pile up forever
+            purged = conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (time.time(),)).rowcount
+            conn.commit()
+            if purged:
+                logger.info(f"Removed {purged} expired entries from LLM cache")
+            self._known_keys = {row[0] for row in conn.execute("SELECT input_hash FROM llm_cache")}
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None if missing or expired"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                if key not in self._known_keys:
+                    return None
+                row = conn.execute(
+                    "SELECT response, expires_at FROM llm_cache WHERE input_hash = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None and row[1] is not None and row[1] < time.time():
+                    # Expired since the database was opened
+                    conn.execute("DELETE FROM llm_cache WHERE input_hash = ?", (key,))
+                    conn.commit()
+                    self._known_keys.discard(key)
+                    return None
+        except sqlite3.Error as e:
+            logger.error(f"Error reading from LLM cache: {e}")
+            return None
+
+        return row[0] if row is not None else None
+
+    def put(self, key: str, value: str, prompt_version: str = "", model_id: str = "",
+            ttl: float = DEFAULT_TTL_SECONDS) -> None:
+        """Store a response under a key, replacing any previous entry"""
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache "
+                    "(input_hash, prompt_version, model_id, response, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, prompt_version, model_id, value, now, now + ttl)
+                )
+                conn.commit()
+                self._known_keys.add(key)
+        except sqlite3.Error as e:
+            logger.error(f"Error writing to LLM cache: {e}")
+
+
+_default_cache = LLMCache()
+
+
+def configure(data_dir: str) -> None:
+    """
+    Keep the default cache in a data directory
+
+    Args:
+        data_dir: Directory the cache file is stored in
+    """
+    global _default_cache
+    db_path = os.path.join(data_dir, CACHE_FILENAME)
+    if db_path != _default_cache.db_path:
+        _default_cache = LLMCache(db_path)
+
+
+def get(key: str) -> Optional[str]:
+    """Look up a response in the default cache"""
+    return _default_cache.get(key)
+
+
+def put(key: str, value: str, prompt_version: str = "", model_id: str = "",
+        ttl: float = DEFAULT_TTL_SECONDS) -> None:
+    """Store a response in the default cache"""
+    _default_cache.put(key, value, prompt_version=prompt_version, model_id=model_id, ttl=ttl)
@@ -1,10 +1,19 @@
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, Callable
 import logging
-from langchain_openai import ChatOpenAI
+import operator
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.embeddings import Embeddings
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_community.chat_models import ChatOllama
+from langchain_community.embeddings import OllamaEmbeddings
+from utils.model_utils import get_available_ollama_models
 
 logger = logging.getLogger(__name__)
 
+# Embedding models used for each provider
+OPENAI_EMBEDDING_MODEL = "text-embedding-3-small"
+OLLAMA_EMBEDDING_MODEL = "nomic-embed-text"
+
 class ModelAdapter:
     """
     Model adapter class to handle different LLM providers.
@@ -35,9 +44,12 @@ class ModelAdapter:
                 api_key=api_key
             )
         elif provider == "ollama":
-            return Ollama(
+            return ChatOllama(
                 model=model_id,
-                temperature=temperature
+                temperature=temperature,
+                # Ollama is run locally, so we use localhost
+                base_url="http://localhost:11434",
+                timeout=60
             )
         else:
             raise ValueError(f"Unsupported model provider: {provider}")
@@ -83,4 +95,47 @@ def get_llm_instance(provider: str = "openai",
             
     except Exception as e:
         logger.error(f"Error creating LLM instance: {e}")
-        raise
\ No newline at end of file
+        raise
+
+def get_embeddings_instance(provider: str = "openai", api_key: Optional[str] = None) -> Optional[Embeddings]:
+    """
+    Get an embedding model served by the same provider as the language model.
+    
+    Args:
+        provider: The model provider ('openai' or 'ollama')
+        api_key: API key for OpenAI models (not needed for Ollama)
+    
+    Returns:
+        An embedding model compatible with LangChain, or None if the provider
+        can't serve embeddings (no API key, or the Ollama model isn't pulled)
+    """
+    if provider.lower() == "openai":
+        if not api_key:
+            return None
+        return OpenAIEmbeddings(model=OPENAI_EMBEDDING_MODEL, openai_api_key=api_key)
+    
+    elif provider.lower() == "ollama":
+        # Model names are listed with their tag, e.g. "nomic-embed-text:latest"
+        pulled = {model.get("name", "").split(":")[0] for model in get_available_ollama_models()}
+        if OLLAMA_EMBEDDING_MODEL not in pulled:
+            return None
+        return OllamaEmbeddings(model=OLLAMA_EMBEDDING_MODEL, base_url="http://localhost:11434")
+    
+    return None
+
+def get_text_extractor(llm: Any) -> Callable[[Any], str]:
+    """
+    Get a function that turns the output of llm.invoke() into text.
+    
+    Chat models return a message whose text is in .content, while plain
+    LLMs return the string directly, so the shape is resolved once per model.
+    
+    Args:
+        llm: The language model instance
+    
+    Returns:
+        A function mapping a response to its text
+    """
+    if isinstance(llm, BaseChatModel):
+        return operator.attrgetter("content")
+    return lambda response: response
@@ -1,6 +1,27 @@
-import requests
+import atexit
 from typing import List, Dict, Any
+from utils.http_utils import create_session
 
+try:
+    import streamlit as st
+    _cache_data = st.cache_data
+except ImportError:
+    # Outside the Streamlit app: no cross-rerun memoization
+    def _cache_data(*args, **kwargs):
+        return lambda func: func
+
+# Shared keep-alive session for the local Ollama API. No retries: the model list
+# is polled on every UI refresh and should fail fast when Ollama isn't running.
+_SESSION = create_session(pool_connections=10, pool_maxsize=20, retries=0)
+
+def close_session() -> None:
+    """Close the pooled connections of the shared session"""
+    _SESSION.close()
+
+atexit.register(close_session)
+
+# Short TTL so newly pulled models show up without restarting the app
+@_cache_data(ttl=30, show_spinner=False)
 def get_available_ollama_models() -> List[Dict[str, Any]]:
     """
     Get a list of locally available Ollama models.
@@ -10,7 +31,7 @@ def get_available_ollama_models() -> List[Dict[str, Any]]:
     """
     try:
         # Try to connect to Ollama API at the default URL
-        response = requests.get("http://localhost:11434/api/tags", timeout=2)
+        response = _SESSION.get("http://localhost:11434/api/tags", timeout=2)
         if response.status_code == 200:
             return response.json().get("models", [])
         return []
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("RateLimiter")
+
+
+class RateLimiter:
+    """
+    Request and token buckets for an API's per-minute limits.
+    Both buckets refill continuously, so callers are throttled before the
+    provider starts answering with 429s instead of backing off after.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        """
+        Initialize the rate limiter
+
+        Args:
+            requests_per_minute: Maximum number of requests per minute
+            tokens_per_minute: Maximum number of tokens (prompt and completion) per minute
+        """
+        self.max_requests = requests_per_minute
+        self.max_tokens = tokens_per_minute
+        self.available_request_capacity = requests_per_minute
+        self.available_token_capacity = tokens_per_minute
+        self._last_update = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the capacity recovered since the last update, up to the limits"""
+        now = time.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+        self.available_request_capacity = min(
+            self.max_requests, self.available_request_capacity + elapsed * self.max_requests / 60.0
+        )
+        self.available_token_capacity = min(
+            self.max_tokens, self.available_token_capacity + elapsed * self.max_tokens / 60.0
+        )
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until one request of the given size fits in both buckets, then consume it.
+        Checking and consuming happen without an await in between, so tasks on the
+        same event loop cannot overdraw the buckets.
+
+        Args:
+            tokens: Estimated number of tokens used by the request
+        """
+        # A request larger than the whole bucket would otherwise wait forever
+        tokens = min(tokens, self.max_tokens)
+        while True:
+            self._refill()
+            if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                self.available_request_capacity -= 1
+                self.available_token_capacity -= tokens
+                return
+
+            # Sleep until the scarcer bucket has recovered enough capacity
+            wait = max(
+                (1 - self.available_request_capacity) * 60.0 / self.max_requests,
+                (tokens - self.available_token_capacity) * 60.0 / self.max_tokens,
+                0.01
+            )
+            logger.debug("Rate limit reached, waiting %.2fs", wait)
+            await asyncio.sleep(wait)
@@ -0,0 +1,106 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger("SemanticCache")
+
+DEFAULT_SEMANTIC_CACHE_PATH = os.path.join("data", "cache", "semantic_cache.sqlite")
+
+# Minimum cosine similarity for two inputs to share a cached response
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+
+
+class SemanticCache:
+    """
+    Disk-backed cache of LLM responses looked up by embedding similarity, so
+    paraphrased inputs (e.g. "LLM agents" vs "agents built on LLMs") reuse a
+    previous response. Meant as a second tier behind the exact-match LLM cache.
+    Entries are grouped by namespace so different prompts or models never mix.
+    """
+
+    def __init__(self, embeddings: Embeddings, db_path: str = DEFAULT_SEMANTIC_CACHE_PATH,
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD):
+        """
+        Args:
+            embeddings: Model used to embed the inputs
+            db_path: Path to the SQLite cache file
+            threshold: Minimum cosine similarity for a hit
+        """
+        self.embeddings = embeddings
+        self.db_path = db_path
+        self.threshold = threshold
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and make sure the table exists"""
+        if self._conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS semantic_cache (
+                    namespace TEXT,
+                    input TEXT,
+                    vector BLOB,
+                    response TEXT,
+                    created_at REAL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_semantic_cache_namespace ON semantic_cache (namespace)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed a text as a unit vector, so a dot product is the cosine similarity"""
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(self, namespace: str, text: str) -> Optional[str]:
+        """Return the response of the most similar cached input above the threshold, or None"""
+        try:
+            query_vector = self._embed(text)
+            with self._lock:
+                rows = self._connect().execute(
+                    "SELECT input, vector, response FROM semantic_cache WHERE namespace = ?",
+                    (namespace,)
+                ).fetchall()
+        except Exception as e:
+            logger.error(f"Error reading from semantic cache: {e}")
+            return None
+
+        # Skip vectors of another size, written with a different embedding model
+        rows = [row for row in rows if len(row[1]) == query_vector.nbytes]
+        if not rows:
+            return None
+
+        similarities = np.stack([np.frombuffer(vector, dtype=np.float32) for _, vector, _ in rows]) @ query_vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        logger.info(f"Semantic cache hit: '{text}' matched '{rows[best][0]}' ({similarities[best]:.3f})")
+        return rows[best][2]
+
+    def put(self, namespace: str, text: str, response: str) -> None:
+        """Store the response for an input"""
+        try:
+            vector = self._embed(text)
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT INTO semantic_cache (namespace, input, vector, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (namespace, text, vector.tobytes(), response, time.time())
+                )
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error writing to semantic cache: {e}")
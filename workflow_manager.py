@@ -1,44 +1,140 @@
 from langgraph.graph import StateGraph
 import os
-import json
+import hashlib
+import sqlite3
+import weakref
+from functools import cached_property, lru_cache
+from pathlib import Path
 import logging
-from typing import Dict, List, Any, Optional, TypedDict, Sequence, Union
+from typing import Dict, List, Any, Optional, TypedDict, Sequence, Union, Iterator, Tuple, Callable
 from agents.planning_agent import PlanningAgent
 from agents.search_agent import SearchAgent
 from agents.integration_agent import IntegrationAgent
-from agents.abstract_agent import AbstractAgent
+from agents.abstract_agent import AbstractAgent, extract_article_text
 from agents.transformation_agent import TransformationAgent
 from agents.writing_agent import WritingAgent
 from agents.rag_agent import RAGAgent
-import concurrent.futures
+from utils.model_adapter import get_llm_instance, get_embeddings_instance
+from utils.embeddings import CachedEmbeddings
+from utils.rate_limiter import RateLimiter
+from utils.semantic_cache import SemanticCache
+from utils import json_utils, llm_cache
+import asyncio
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import time
 import streamlit as st
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:
+    SqliteSaver = None
+
+# Logging is configured by the application (see configure_logging in app.py); importing
+# this module leaves the root logger alone, so dependencies don't log at INFO by default
 logger = logging.getLogger("ResearchWorkflow")
+logger.addHandler(logging.NullHandler())
+
+# Default maximum number of abstract LLM requests in flight. Ollama serves requests one at
+# a time unless the server is started with OLLAMA_NUM_PARALLEL set to a higher value.
+MAX_CONCURRENT_ABSTRACTS = 16
+
+# Per-minute OpenAI limits the abstract requests are throttled to; set them to
+# the account's tier so large runs stay under the limits instead of retrying 429s
+OPENAI_REQUESTS_PER_MINUTE = float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_TOKENS_PER_MINUTE = float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "200000"))
+
+# Graph nodes, in the order they typically complete; content_fetch runs
+# in parallel with integration
+WORKFLOW_STEPS = ("planning", "searching", "integration", "content_fetch", "abstracting", "transformation", "writing")
+
+# Ways abstracts can be generated: direct LLM calls, or the OpenAI Batch API
+ABSTRACT_BATCH_MODES = ("sync", "openai_batch")
+
+# Minimum number of articles for which abstracts go through the OpenAI Batch API
+BATCH_API_THRESHOLD = 20
+
+# Checkpoint database in the data directory, from which interrupted runs resume
+CHECKPOINT_FILENAME = "wf_checkpoint.sqlite"
+
+# Live workflows by ID; the run config only carries the ID, since checkpointers
+# may persist the config and the workflow itself isn't serializable
+_WORKFLOWS: "weakref.WeakValueDictionary[str, ResearchWorkflow]" = weakref.WeakValueDictionary()
+
+if SqliteSaver is not None:
+    class _LockedSqliteSaver(SqliteSaver):
+        """
+        SQLite checkpointer whose connection is used by one thread at a time: the saver
+        is shared by every workflow and by the parallel branches of a run
+        """
+
+        def __init__(self, conn: sqlite3.Connection):
+            super().__init__(conn)
+            self._conn_lock = threading.RLock()
+
+        def get_tuple(self, *args, **kwargs):
+            with self._conn_lock:
+                return super().get_tuple(*args, **kwargs)
+
+        def list(self, *args, **kwargs):
+            with self._conn_lock:
+                return list(super().list(*args, **kwargs))
+
+        def put(self, *args, **kwargs):
+            with self._conn_lock:
+                return super().put(*args, **kwargs)
+
+        def put_writes(self, *args, **kwargs):
+            with self._conn_lock:
+                return super().put_writes(*args, **kwargs)
+
+        def delete_thread(self, thread_id: str) -> None:
+            """Delete every checkpoint of a thread, so its next run starts fresh"""
+            with self._conn_lock:
+                for table in ("checkpoints", "writes"):
+                    try:
+                        self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+                    except sqlite3.OperationalError:
+                        # Table not created yet: nothing was saved to it
+                        pass
+                self.conn.commit()
+
+def _step_node(method_name: str):
+    """
+    Graph node calling a step method on the ResearchWorkflow named in the run's
+    config, so a single compiled graph serves every workflow instance
+    """
+    def node(state: Dict[str, Any], config: Dict[str, Any]) -> Dict[str, Any]:
+        return getattr(_WORKFLOWS[config["configurable"]["workflow_id"]], method_name)(state)
+    node.__name__ = method_name
+    return node
 
 class WorkflowState(TypedDict, total=False):
     topic: str
     plan: Dict[str, Any]
     articles: List[Dict[str, Any]]
-    article_contents: List[str]
-    csv_path: str
+    url_to_raw_filepath: Dict[str, str]
+    articles_enriched: List[Dict[str, Any]]
     url_to_filepath: Dict[str, str]
     abstracts: List[Dict[str, Any]]
     final_csv_path: str
     report: str
     latex_report: Dict[str, Any]
+    latex_report_content: str
+    report_path: str
 
 class ResearchWorkflow:
     def __init__(self, 
                  data_dir: str = "data", 
                  model_provider: str = "openai", 
                  model_id: str = "gpt-3.5-turbo",
-                 api_key: Optional[str] = None):
+                 api_key: Optional[str] = None,
+                 abstract_batch_mode: str = "sync",
+                 abstracts_per_prompt: int = 1,
+                 progress_queue: Optional[queue.Queue] = None,
+                 abstract_max_workers: Optional[int] = None):
         """
         Initialize the research workflow with all required agents
         
@@ -47,37 +143,135 @@ class ResearchWorkflow:
             model_provider: The model provider ('openai' or 'ollama')
             model_id: The model ID to use
             api_key: API key for OpenAI models (not needed for Ollama)
+            abstract_batch_mode: "sync" for direct LLM calls, or "openai_batch" to generate
+                abstracts through the OpenAI Batch API when there are more than
+                BATCH_API_THRESHOLD articles. Half the cost, but the run waits until
+                the batch completes, which can take hours; a batch still running after
+                BATCH_MAX_WAIT_SECONDS is cancelled and the rest is done with direct calls.
+            abstracts_per_prompt: Number of articles summarized together in one LLM
+                call. Values above 1 save the repeated instructions and requests,
+                at some risk of less focused abstracts.
+            progress_queue: Queue receiving ("abstract", done, total) events as abstracts
+                complete, and ("restored", steps) with the number of steps a resumed run
+                skips, so a UI thread can poll progress at its own pace
+            abstract_max_workers: Maximum number of abstract LLM requests in flight, whether
+                each request summarizes one article or several. The requests are I/O-bound,
+                so this can be well above the core count for OpenAI; for Ollama, values
+                above the server's OLLAMA_NUM_PARALLEL only queue up.
+                Defaults to the RESEARCH_ABSTRACT_MAX_WORKERS environment variable, then
+                MAX_CONCURRENT_ABSTRACTS.
         """
         logger.info(f"Initializing ResearchWorkflow with provider={model_provider}, model={model_id}")
-        self.planning_agent = PlanningAgent(provider=model_provider, model_id=model_id, api_key=api_key)
-        self.search_agent = SearchAgent()
-        self.integration_agent = IntegrationAgent(data_dir=data_dir)
-        self.abstract_agent = AbstractAgent(provider=model_provider, model_id=model_id, api_key=api_key)
-        self.transformation_agent = TransformationAgent(data_dir=data_dir)
-        self.writing_agent = WritingAgent(provider=model_provider, model_id=model_id, api_key=api_key)
-        self.rag_agent = RAGAgent()
+        if abstract_batch_mode not in ABSTRACT_BATCH_MODES:
+            raise ValueError(f"Unsupported abstract batch mode: {abstract_batch_mode}")
+        if abstract_batch_mode == "openai_batch" and model_provider != "openai":
+            raise ValueError("The OpenAI batch mode requires the openai model provider")
+            
+        # Use API key from environment if not provided
+        if model_provider == "openai" and not api_key:
+            api_key = os.getenv("OPENAI_API_KEY")
+            
+        # Agents are created on first use, so runs that stop early never build the rest
+        self.model_provider = model_provider
+        self.model_id = model_id
+        self._api_key = api_key
         self.data_dir = data_dir
-        logger.info("All agents initialized successfully")
+        # Cached LLM responses live next to the rest of the run's data
+        llm_cache.configure(data_dir)
+        self.abstract_batch_mode = abstract_batch_mode
+        self.abstracts_per_prompt = abstracts_per_prompt
+        self.progress_queue = progress_queue
+        if abstract_max_workers is None:
+            abstract_max_workers = int(os.getenv("RESEARCH_ABSTRACT_MAX_WORKERS", MAX_CONCURRENT_ABSTRACTS))
+        self.abstract_max_workers = max(1, abstract_max_workers)
+        # Checkpoint thread of the current run, set by stream()
+        self._run_id: Optional[str] = None
+        
+        # The state graph is compiled once and shared by all instances
+        self.graph = self._build_graph(os.path.join(data_dir, CHECKPOINT_FILENAME))
+        _WORKFLOWS[str(id(self))] = self
         
-        # Setup state graph
-        self.graph = self._build_graph()
+    @cached_property
+    def llm(self):
+        """Language model shared by the planning, abstract and writing agents"""
+        return get_llm_instance(self.model_provider, self.model_id, self._api_key)
         
-    def _build_graph(self) -> StateGraph:
-        """Build the workflow graph"""
+    @cached_property
+    def semantic_cache(self) -> Optional[SemanticCache]:
+        """Cache reusing the plan of a paraphrased topic, if the provider can embed topics"""
+        embeddings = get_embeddings_instance(self.model_provider, self._api_key)
+        if embeddings is None:
+            logger.info(f"No embedding model available for {self.model_provider}, semantic plan cache disabled")
+            return None
+        cache_dir = os.path.join(self.data_dir, "cache")
+        return SemanticCache(
+            CachedEmbeddings(embeddings, model_name=f"{self.model_provider}/{getattr(embeddings, 'model', '')}",
+                             db_path=os.path.join(cache_dir, "embed_cache.sqlite")),
+            db_path=os.path.join(cache_dir, "semantic_cache.sqlite")
+        )
+        
+    @cached_property
+    def planning_agent(self) -> PlanningAgent:
+        return PlanningAgent(provider=self.model_provider, model_id=self.model_id, api_key=self._api_key, llm=self.llm,
+                             semantic_cache=self.semantic_cache)
+        
+    @cached_property
+    def search_agent(self) -> SearchAgent:
+        return SearchAgent()
+        
+    @cached_property
+    def integration_agent(self) -> IntegrationAgent:
+        return IntegrationAgent(data_dir=self.data_dir)
+        
+    @cached_property
+    def abstract_agent(self) -> AbstractAgent:
+        return AbstractAgent(provider=self.model_provider, model_id=self.model_id, api_key=self._api_key,
+                             llm=self.llm, rag_agent=self.rag_agent)
+        
+    @cached_property
+    def transformation_agent(self) -> TransformationAgent:
+        return TransformationAgent(data_dir=self.data_dir)
+        
+    @cached_property
+    def writing_agent(self) -> WritingAgent:
+        return WritingAgent(provider=self.model_provider, model_id=self.model_id, api_key=self._api_key,
+                            llm=self.llm, rag_agent=self.rag_agent)
+        
+    @cached_property
+    def rag_agent(self) -> RAGAgent:
+        """Knowledge base shared by the abstract, transformation and writing steps"""
+        return RAGAgent()
+        
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _build_graph(checkpoint_path: Optional[str] = None) -> StateGraph:
+        """
+        Build and compile the workflow graph; the topology is static, so this runs
+        once per checkpoint database
+        
+        Args:
+            checkpoint_path: SQLite file where the state is saved after each step, so
+                an interrupted run resumes from the last completed step
+        """
         workflow = StateGraph(WorkflowState)
         
-        # Define nodes for each step
-        workflow.add_node("planning", self._planning_step)
-        workflow.add_node("searching", self._search_step)
-        workflow.add_node("integration", self._integration_step)
-        workflow.add_node("abstracting", self._abstract_step)
-        workflow.add_node("transformation", self._transformation_step)
-        workflow.add_node("writing", self._writing_step)
+        # Define nodes for each step; they dispatch to the workflow given in the run's config
+        workflow.add_node("planning", _step_node("_planning_step"))
+        workflow.add_node("searching", _step_node("_search_step"))
+        workflow.add_node("content_fetch", _step_node("_content_fetch_step"))
+        workflow.add_node("integration", _step_node("_integration_step"))
+        workflow.add_node("abstracting", _step_node("_abstract_step"))
+        workflow.add_node("transformation", _step_node("_transformation_step"))
+        workflow.add_node("writing", _step_node("_writing_step"))
         
         # Define edges
         workflow.add_edge("planning", "searching")
+        # PDF downloads and page fetches are independent, so they run in parallel;
+        # they write disjoint state keys. Abstracting waits for both, as articles
+        # without a PDF are summarized from their page
         workflow.add_edge("searching", "integration")
-        workflow.add_edge("integration", "abstracting")
+        workflow.add_edge("searching", "content_fetch")
+        workflow.add_edge(["integration", "content_fetch"], "abstracting")
         workflow.add_edge("abstracting", "transformation")
         workflow.add_edge("transformation", "writing")
         
@@ -87,8 +281,15 @@ class ResearchWorkflow:
         # Mark writing as the end node
         workflow.set_finish_point("writing") 
         
-        # Compile the graph
-        return workflow.compile()
+        # Compile the graph, saving checkpoints when the SQLite saver is available
+        checkpointer = None
+        if checkpoint_path and SqliteSaver is None:
+            logger.warning("langgraph.checkpoint.sqlite is not available (bundled with langgraph<0.2), "
+                           "interrupted workflows will not resume")
+        elif checkpoint_path:
+            os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+            checkpointer = _LockedSqliteSaver(sqlite3.connect(checkpoint_path, check_same_thread=False))
+        return workflow.compile(checkpointer=checkpointer)
         
     def _planning_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate research plan"""
@@ -96,8 +297,14 @@ class ResearchWorkflow:
         topic = state.get("topic", "")
         logger.info(f"Generating research plan for topic: {topic}")
         
+        # Build the search agent and connect to arXiv while the LLM writes the plan
+        search_agent = self.search_agent
+        threading.Thread(target=search_agent.warm_connection_pool, daemon=True).start()
+        
         plan = self.planning_agent.generate_plan(topic)
-        logger.info(f"Generated plan: {json.dumps(plan, indent=2)}")
+        # Only serialize the plan when the record is going to be emitted
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Generated plan: %s", json_utils.dumps(plan, indent=logger.isEnabledFor(logging.DEBUG)))
         
         return {"plan": plan}
         
@@ -109,76 +316,222 @@ class ResearchWorkflow:
         
         articles = self.search_agent.search_articles(plan)
         logger.info(f"Found {len(articles)} articles")
+        return {"articles": articles}
+        
+    def _content_fetch_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch the web page content of each article"""
+        logger.info("🌐 Starting Content Fetch Step")
+        articles = state.get("articles", [])
         
-        # Fetch article contents
+        # Fetch article contents straight to disk; only the paths go into the state
         logger.info("Fetching content for each article...")
-        article_contents = []
-        for i, article in enumerate(articles, 1):
-            logger.info(f"Fetching content for article {i}/{len(articles)}: {article.get('title', '')}")
-            content = self.search_agent.fetch_article_content(article["url"])
-            article_contents.append(content)
+        # Each distinct URL is fetched once, in first-seen order
+        urls = list(dict.fromkeys(article["url"] for article in articles))
+        url_to_raw_filepath = self.search_agent.fetch_many_to_files(
+            urls, os.path.join(self.data_dir, "tmp"), max_workers=10
+        )
             
-        logger.info(f"Successfully fetched content for {len(article_contents)} articles")
-        return {"articles": articles, "article_contents": article_contents}
+        logger.info(f"Successfully fetched content for {len(url_to_raw_filepath)} articles")
+        return {"url_to_raw_filepath": url_to_raw_filepath}
         
     def _integration_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Save articles to CSV and download PDFs"""
+        """Download PDFs, keeping the enriched articles in memory until transformation"""
         logger.info("💾 Starting Integration Step")
         articles = state.get("articles", [])
-        plan = state.get("plan", {})
-        topic = plan.get("topic", "research_topic")
         
-        # Download PDFs and save to CSV
+        # Download PDFs
         logger.info("Processing articles...")
-        csv_path, url_to_filepath = self.integration_agent.process_articles(articles, topic)
-        logger.info(f"Articles processed and saved to: {csv_path}")
+        articles_enriched, url_to_filepath = self.integration_agent.process_articles(articles)
+        logger.info(f"Processed {len(articles_enriched)} articles")
         
         return {
-            "csv_path": csv_path,
+            "articles_enriched": articles_enriched,
             "url_to_filepath": url_to_filepath
         }
         
     def _abstract_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate abstracts for articles"""
         logger.info("📝 Starting Abstract Generation Step")
-        url_to_filepath = state.get("url_to_filepath", {})
-        if url_to_filepath is None:
-            url_to_filepath = {}
+        # Summarize the PDF where one was downloaded, the fetched web page otherwise
+        url_to_filepath = {**(state.get("url_to_raw_filepath") or {}), **(state.get("url_to_filepath") or {})}
         logger.info(f"Processing {len(url_to_filepath)} articles for abstract generation")
         
-        abstracts = []
-        # Process each article file
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_filepath = {
-                executor.submit(self.abstract_agent.process_article_file, filepath): filepath
-                for filepath in url_to_filepath.values() if filepath
-            }
+        # Different URLs of one paper can map to the same file; summarize each file once
+        filepaths = list({
+            os.path.realpath(filepath): filepath for filepath in url_to_filepath.values() if filepath
+        }.values())
+        
+        # The PDF URL lets the abstract agent fall back to the PDF, and index it in the
+        # knowledge base, when a file's text is too thin to summarize
+        url_to_pdf_url = {article.get("url"): article.get("pdf_url") for article in state.get("articles", [])}
+        pdf_urls = {filepath: url_to_pdf_url.get(url) for url, filepath in url_to_filepath.items() if filepath}
+        
+        # Articles finished before an interrupted run of this step stopped are not redone
+        completed = self._load_abstract_progress()
+        pending = [filepath for filepath in filepaths if filepath not in completed]
+        if completed:
+            logger.info(f"Reusing {len(filepaths) - len(pending)} abstracts completed by an interrupted run")
             
-            for future in concurrent.futures.as_completed(future_to_filepath):
-                filepath = future_to_filepath[future]
-                try:
-                    logger.info(f"Generating abstract for: {os.path.basename(filepath)}")
-                    result = future.result()
-                    abstracts.append(result)
-                    logger.info(f"Successfully generated abstract for: {os.path.basename(filepath)}")
-                except Exception as e:
-                    logger.error(f"Error processing {filepath}: {e}")
-                    abstracts.append({
-                        "file_path": filepath,
-                        "abstract": f"Error: {e}",
-                        "error": str(e)
-                    })
+        # Record and report each abstract as soon as it is generated, whichever path generates it
+        finished = {filepath for filepath in filepaths if filepath in completed}
+        self._report_progress("abstract", len(finished), len(filepaths))
+        
+        def on_result(result: Dict[str, Any]) -> None:
+            self._record_abstract_progress(result)
+            finished.add(result["file_path"])
+            self._report_progress("abstract", len(finished), len(filepaths))
+        
+        new_abstracts = None
+        if self.abstract_batch_mode == "openai_batch" and len(pending) > BATCH_API_THRESHOLD:
+            try:
+                logger.info("Generating abstracts through the OpenAI Batch API")
+                new_abstracts = self.abstract_agent.process_article_files_batch_api(
+                    pending, pdf_urls=pdf_urls, on_result=on_result
+                )
+            except Exception as e:
+                # Includes batches cancelled for taking too long
+                logger.error(f"OpenAI batch failed, falling back to direct calls: {e}")
+                # Keep whatever the batch answered before it failed
+                completed.update(self._load_abstract_progress())
+                pending = [filepath for filepath in filepaths if filepath not in completed]
+                
+        if new_abstracts is None and self.abstracts_per_prompt > 1:
+            logger.info(f"Generating abstracts {self.abstracts_per_prompt} articles per prompt")
+            new_abstracts = self.abstract_agent.process_article_files_batch(
+                pending, batch_size=self.abstracts_per_prompt, pdf_urls=pdf_urls, on_result=on_result,
+                max_workers=self.abstract_max_workers
+            )
+                
+        if new_abstracts is None:
+            # Generate all abstracts concurrently on an event loop
+            new_abstracts = asyncio.run(self._abstract_step_async(pending, pdf_urls, on_result))
+            
+        completed.update(zip(pending, new_abstracts))
+        abstracts = [completed[filepath] for filepath in filepaths]
+        
+        # Persist PDF content indexed during abstract generation
+        self.abstract_agent.flush_knowledge_base()
+        
+        # The step's output is in the graph checkpoint from here on
+        self._clear_abstract_progress()
         
         logger.info(f"Completed abstract generation for {len(abstracts)} articles")            
         return {"abstracts": abstracts}
         
+    def _abstract_progress_path(self) -> Optional[str]:
+        """File recording the abstracts completed so far by the current run, if any"""
+        if self._run_id is None:
+            return None
+        return os.path.join(self.data_dir, "cache", f"abstracts_{self._run_id}.jsonl")
+        
+    def _load_abstract_progress(self) -> Dict[str, Dict[str, Any]]:
+        """Abstracts recorded by an interrupted run of the abstract step, by file path"""
+        path = self._abstract_progress_path()
+        completed = {}
+        if path is None or not os.path.exists(path):
+            return completed
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        result = json_utils.loads(line)
+                        completed[result["file_path"]] = result
+        except Exception as e:
+            # A line cut short by a crash: keep whatever was read before it
+            logger.warning(f"Could not read abstract progress {path}: {e}")
+        return completed
+        
+    def _record_abstract_progress(self, result: Dict[str, Any]) -> None:
+        """Append a successfully generated abstract to the current run's progress file"""
+        path = self._abstract_progress_path()
+        if path is None or "error" in result or str(result.get("abstract", "")).startswith("Error"):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json_utils.dumps(result) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not record abstract progress: {e}")
+            
+    def _clear_abstract_progress(self) -> None:
+        """Remove the current run's progress file once the step has completed"""
+        path = self._abstract_progress_path()
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+        
+    def _report_progress(self, *event: Any) -> None:
+        """Publish a progress event to the progress queue, if one was given"""
+        if self.progress_queue is not None:
+            self.progress_queue.put(event)
+            
+    async def _abstract_step_async(self, filepaths: List[str],
+                                   pdf_urls: Optional[Dict[str, Optional[str]]] = None,
+                                   on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+                                   ) -> List[Dict[str, Any]]:
+        """
+        Generate abstracts for article files: text extraction runs in a process
+        pool to use all cores, then the LLM calls run concurrently on the event loop
+        
+        Args:
+            filepaths: Paths to the article files
+            pdf_urls: Optional mapping of file path to the article's PDF URL
+            on_result: Optional callback given each article's result as soon as it is known
+        """
+        pdf_urls = pdf_urls or {}
+        loop = asyncio.get_running_loop()
+        
+        texts = []
+        if filepaths:
+            workers = min(len(filepaths), os.cpu_count() or 1)
+            logger.info("Text extraction pool size=%d for %d files", workers, len(filepaths))
+            # Spawn rather than fork: forking the Streamlit process copies its
+            # threads' locks in whatever state they happen to be in
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                texts = await asyncio.gather(
+                    *(loop.run_in_executor(executor, extract_article_text, filepath) for filepath in filepaths),
+                    return_exceptions=True
+                )
+        
+        semaphore = asyncio.Semaphore(self.abstract_max_workers)
+        # Local Ollama models have no API limits to respect
+        rate_limiter = None
+        if self.model_provider == "openai":
+            rate_limiter = RateLimiter(OPENAI_REQUESTS_PER_MINUTE, OPENAI_TOKENS_PER_MINUTE)
+            
+        async def process(filepath: str, text) -> Dict[str, Any]:
+            try:
+                if isinstance(text, Exception):
+                    raise text
+                title, article_content = text
+                async with semaphore:
+                    logger.info(f"Generating abstract for: {os.path.basename(filepath)}")
+                    result = await self.abstract_agent.aprocess_article_text(
+                        filepath, title, article_content, pdf_url=pdf_urls.get(filepath),
+                        rate_limiter=rate_limiter
+                    )
+                    logger.info(f"Successfully generated abstract for: {os.path.basename(filepath)}")
+            except Exception as e:
+                logger.error(f"Error processing {filepath}: {e}")
+                result = {
+                    "file_path": filepath,
+                    "abstract": f"Error: {e}",
+                    "error": str(e)
+                }
+            if on_result is not None:
+                on_result(result)
+            return result
+            
+        return list(await asyncio.gather(*(process(filepath, text) for filepath, text in zip(filepaths, texts))))
+        
     def _transformation_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate CSV with details and communicate with RAGAgent if information is missing"""
         logger.info("🔄 Starting Transformation Step")
-        csv_path = state.get("csv_path", "")
-        articles = state.get("articles", [])
+        articles = state.get("articles_enriched", [])
         
-        # Generate CSV with details
+        # Merge the generated abstracts, then write the CSV with details, once
+        articles = self.transformation_agent.add_abstracts(
+            articles, state.get("abstracts", []), state.get("url_to_raw_filepath") or {}
+        )
         logger.info("Generating CSV with article details...")
         detailed_csv_path = self.transformation_agent.generate_csv_with_details(articles, self.rag_agent)
         logger.info(f"Detailed CSV saved to: {detailed_csv_path}")
@@ -196,38 +549,85 @@ class ResearchWorkflow:
         logger.info("Writing academic report...")
         latex_report = self.writing_agent.write_report(plan, csv_path)
         
-        # Save LaTeX document to file
+        # Save LaTeX document to file in a single buffered write
+        latex_report_content = latex_report["latex_document"]
         report_path = os.path.join(self.data_dir, "academic_report.tex")
-        with open(report_path, "w", encoding="utf-8") as f:
-            f.write(latex_report["latex_document"])
+        Path(report_path).write_text(latex_report_content, encoding="utf-8")
         logger.info(f"LaTeX report saved to: {report_path}")
         
+        # The content is returned as well so the UI doesn't read the file back
         return {
             "latex_report": latex_report,
+            "latex_report_content": latex_report_content,
             "report_path": report_path
         }
         
-    def run(self, topic: str) -> Dict[str, Any]:
+    def stream(self, topic: str, resume: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
         """
-        Run the complete research workflow
+        Run the research workflow step by step
         
         Args:
             topic: Research topic to investigate
+            resume: Continue an interrupted run on the same topic; when False, its
+                checkpoint and abstract progress are discarded and the run starts over
             
-        Returns:
-            Dictionary with the final results
+        Yields:
+            (node name, state update) as each step of WORKFLOW_STEPS completes. When an
+            interrupted run on the same topic is resumed, the state restored from its
+            checkpoint comes first, as ("checkpoint", state).
         """
         logger.info(f"🚀 Starting research workflow for topic: {topic}")
         # Initialize state with topic
         state = {"topic": topic}
+        # Runs on the same topic with the same model share a checkpoint thread
+        self._run_id = hashlib.sha256(f"{self.model_provider}|{self.model_id}|{topic}".encode()).hexdigest()
+        config = {"configurable": {
+            "workflow_id": str(id(self)),
+            "thread_id": self._run_id
+        }}
         
         # Run the workflow
         try:
-            # Use the correct method to invoke the graph
-            # Instead of directly calling the graph object, use graph.invoke()
-            result = self.graph.invoke(state)
+            if self.graph.checkpointer is not None and not resume:
+                self.graph.checkpointer.delete_thread(self._run_id)
+                self._clear_abstract_progress()
+            elif self.graph.checkpointer is not None:
+                snapshot = self.graph.get_state(config)
+                if snapshot.next:
+                    # The last run on this topic stopped part-way: continue from its checkpoint
+                    logger.info(f"Resuming interrupted workflow at: {', '.join(snapshot.next)}")
+                    state = None
+                    # Steps complete in WORKFLOW_STEPS order, so every step before the
+                    # first one still to run was completed by the interrupted run
+                    restored = min((WORKFLOW_STEPS.index(step) for step in snapshot.next if step in WORKFLOW_STEPS),
+                                   default=0)
+                    self._report_progress("restored", restored)
+                    yield "checkpoint", dict(snapshot.values)
+                    
+            for chunk in self.graph.stream(state, config=config):
+                for node, update in chunk.items():
+                    # Some langgraph versions also emit the final state under __end__
+                    if node == "__end__":
+                        continue
+                    logger.info(f"Step completed: {node}")
+                    yield node, update or {}
             logger.info("🏁 Workflow execution completed")
-            return result
         except Exception as e:
             logger.error(f"Error in workflow execution: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+            
+    def run(self, topic: str, resume: bool = True) -> Dict[str, Any]:
+        """
+        Run the complete research workflow
+        
+        Args:
+            topic: Research topic to investigate
+            resume: Continue an interrupted run on the same topic instead of starting over
+            
+        Returns:
+            Dictionary with the final results
+        """
+        result = {"topic": topic}
+        for _, update in self.stream(topic, resume=resume):
+            result.update(update)
+        return result